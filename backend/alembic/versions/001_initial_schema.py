@@ -16,8 +16,43 @@ down_revision: Union[str, None] = None
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
+# Secondary indexes on the high-write tables. On PostgreSQL these are built
+# with CREATE INDEX CONCURRENTLY outside the migration transaction, so running
+# them against populated tables does not take a lock that blocks writers.
+HOT_TABLE_INDEXES = [
+    ('ix_form_instances_template_id', 'form_instances', ['template_id']),
+    ('ix_form_instances_owner_id', 'form_instances', ['owner_id']),
+    ('ix_form_instances_status', 'form_instances', ['status']),
+    ('ix_form_data_form_instance_id', 'form_data', ['form_instance_id']),
+    ('ix_change_events_form_instance_id', 'change_events', ['form_instance_id']),
+    ('ix_change_events_version_id', 'change_events', ['version_id']),
+    ('ix_change_events_user_id', 'change_events', ['user_id']),
+    ('ix_change_events_field_id', 'change_events', ['field_id']),
+]
+
+
+def _create_hot_table_indexes() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        for name, table, columns in HOT_TABLE_INDEXES:
+            op.create_index(name, table, columns)
+        return
+    
+    # CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns in HOT_TABLE_INDEXES:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} ({', '.join(columns)})"
+            )
+
 
 def upgrade() -> None:
+    if op.get_context().dialect.name == 'postgresql':
+        # Fail fast instead of queueing behind a long-running lock holder.
+        # LOCAL: ends with this transaction, so the concurrent index builds
+        # and later migrations in the same run are not held to it.
+        op.execute("SET LOCAL lock_timeout = '5s'")
+    
     # Users table
     op.create_table(
         'users',
@@ -29,10 +64,9 @@ def upgrade() -> None:
         sa.Column('is_active', sa.Boolean(), nullable=True, default=True),
         sa.Column('created_at', sa.DateTime(), nullable=True),
         sa.Column('updated_at', sa.DateTime(), nullable=True),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        sa.Index('ix_users_email', 'email', unique=True)
     )
-    op.create_index('ix_users_id', 'users', ['id'])
-    op.create_index('ix_users_email', 'users', ['email'], unique=True)
     
     # Templates table
     op.create_table(
@@ -50,7 +84,6 @@ def upgrade() -> None:
         sa.Column('updated_at', sa.DateTime(), nullable=True),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index('ix_templates_id', 'templates', ['id'])
     
     # Form instances table
     op.create_table(
@@ -68,10 +101,6 @@ def upgrade() -> None:
         sa.ForeignKeyConstraint(['owner_id'], ['users.id']),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index('ix_form_instances_id', 'form_instances', ['id'])
-    op.create_index('ix_form_instances_template_id', 'form_instances', ['template_id'])
-    op.create_index('ix_form_instances_owner_id', 'form_instances', ['owner_id'])
-    op.create_index('ix_form_instances_status', 'form_instances', ['status'])
     
     # Form versions table
     op.create_table(
@@ -88,10 +117,9 @@ def upgrade() -> None:
         sa.Column('created_by_id', sa.Integer(), nullable=False),
         sa.ForeignKeyConstraint(['form_instance_id'], ['form_instances.id']),
         sa.ForeignKeyConstraint(['created_by_id'], ['users.id']),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        sa.Index('ix_form_versions_form_instance_id', 'form_instance_id')
     )
-    op.create_index('ix_form_versions_id', 'form_versions', ['id'])
-    op.create_index('ix_form_versions_form_instance_id', 'form_versions', ['form_instance_id'])
     
     # Form data table (current working data)
     op.create_table(
@@ -104,8 +132,6 @@ def upgrade() -> None:
         sa.PrimaryKeyConstraint('id'),
         sa.UniqueConstraint('form_instance_id')
     )
-    op.create_index('ix_form_data_id', 'form_data', ['id'])
-    op.create_index('ix_form_data_form_instance_id', 'form_data', ['form_instance_id'])
     
     # Change events table (audit trail)
     op.create_table(
@@ -128,11 +154,6 @@ def upgrade() -> None:
         sa.ForeignKeyConstraint(['user_id'], ['users.id']),
         sa.PrimaryKeyConstraint('id')
     )
-    op.create_index('ix_change_events_id', 'change_events', ['id'])
-    op.create_index('ix_change_events_form_instance_id', 'change_events', ['form_instance_id'])
-    op.create_index('ix_change_events_version_id', 'change_events', ['version_id'])
-    op.create_index('ix_change_events_user_id', 'change_events', ['user_id'])
-    op.create_index('ix_change_events_field_id', 'change_events', ['field_id'])
     
     # Comment threads table
     op.create_table(
@@ -147,11 +168,10 @@ def upgrade() -> None:
         sa.Column('created_at', sa.DateTime(), nullable=True),
         sa.ForeignKeyConstraint(['form_instance_id'], ['form_instances.id']),
         sa.ForeignKeyConstraint(['resolved_by_id'], ['users.id']),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        sa.Index('ix_comment_threads_form_instance_id', 'form_instance_id'),
+        sa.Index('ix_comment_threads_field_id', 'field_id')
     )
-    op.create_index('ix_comment_threads_id', 'comment_threads', ['id'])
-    op.create_index('ix_comment_threads_form_instance_id', 'comment_threads', ['form_instance_id'])
-    op.create_index('ix_comment_threads_field_id', 'comment_threads', ['field_id'])
     
     # Comments table
     op.create_table(
@@ -165,11 +185,10 @@ def upgrade() -> None:
         sa.Column('is_deleted', sa.Boolean(), nullable=True, default=False),
         sa.ForeignKeyConstraint(['thread_id'], ['comment_threads.id']),
         sa.ForeignKeyConstraint(['author_id'], ['users.id']),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        sa.Index('ix_comments_thread_id', 'thread_id'),
+        sa.Index('ix_comments_author_id', 'author_id')
     )
-    op.create_index('ix_comments_id', 'comments', ['id'])
-    op.create_index('ix_comments_thread_id', 'comments', ['thread_id'])
-    op.create_index('ix_comments_author_id', 'comments', ['author_id'])
     
     # Review actions table
     op.create_table(
@@ -184,26 +203,35 @@ def upgrade() -> None:
         sa.ForeignKeyConstraint(['form_instance_id'], ['form_instances.id']),
         sa.ForeignKeyConstraint(['version_id'], ['form_versions.id']),
         sa.ForeignKeyConstraint(['performed_by_id'], ['users.id']),
-        sa.PrimaryKeyConstraint('id')
+        sa.PrimaryKeyConstraint('id'),
+        sa.Index('ix_review_actions_form_instance_id', 'form_instance_id'),
+        sa.Index('ix_review_actions_version_id', 'version_id'),
+        sa.Index('ix_review_actions_performed_by_id', 'performed_by_id')
     )
-    op.create_index('ix_review_actions_id', 'review_actions', ['id'])
-    op.create_index('ix_review_actions_form_instance_id', 'review_actions', ['form_instance_id'])
-    op.create_index('ix_review_actions_version_id', 'review_actions', ['version_id'])
-    op.create_index('ix_review_actions_performed_by_id', 'review_actions', ['performed_by_id'])
+    
+    _create_hot_table_indexes()
 
 
 def downgrade() -> None:
-    op.drop_table('review_actions')
-    op.drop_table('comments')
-    op.drop_table('comment_threads')
-    op.drop_table('change_events')
-    op.drop_table('form_data')
-    op.drop_table('form_versions')
-    op.drop_table('form_instances')
-    op.drop_table('templates')
-    op.drop_table('users')
+    is_postgresql = op.get_context().dialect.name == 'postgresql'
+    
+    # IF EXISTS so a half-applied schema can still be torn down
+    cascade = " CASCADE" if is_postgresql else ""
+    for table in [
+        'review_actions',
+        'comments',
+        'comment_threads',
+        'change_events',
+        'form_data',
+        'form_versions',
+        'form_instances',
+        'templates',
+        'users',
+    ]:
+        op.execute(f"DROP TABLE IF EXISTS {table}{cascade}")
     
-    # Drop enums
-    op.execute("DROP TYPE IF EXISTS reviewactiontype")
-    op.execute("DROP TYPE IF EXISTS formstatus")
-    op.execute("DROP TYPE IF EXISTS userrole")
+    # Drop enums (only PostgreSQL has named enum types)
+    if is_postgresql:
+        op.execute("DROP TYPE IF EXISTS reviewactiontype")
+        op.execute("DROP TYPE IF EXISTS formstatus")
+        op.execute("DROP TYPE IF EXISTS userrole")
@@ -0,0 +1,42 @@
+"""Drop redundant primary key indexes
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '002'
+down_revision: Union[str, None] = '001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Primary keys are already backed by a unique index, so these were duplicates.
+# Databases created from the current 001 revision never had them.
+PK_INDEXED_TABLES = [
+    'users',
+    'templates',
+    'form_instances',
+    'form_versions',
+    'form_data',
+    'change_events',
+    'comment_threads',
+    'comments',
+    'review_actions',
+]
+
+
+def upgrade() -> None:
+    for table in PK_INDEXED_TABLES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_id")
+
+
+def downgrade() -> None:
+    for table in PK_INDEXED_TABLES:
+        op.create_index(f'ix_{table}_id', table, ['id'])
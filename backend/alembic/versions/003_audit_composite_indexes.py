@@ -0,0 +1,47 @@
+"""Composite indexes for audit and review queries
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '003'
+down_revision: Union[str, None] = '002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NEW_INDEXES = [
+    ('ix_change_events_form_ts', 'change_events', ['form_instance_id', 'timestamp']),
+    ('ix_change_events_form_field', 'change_events', ['form_instance_id', 'field_id']),
+    ('ix_review_actions_form_created', 'review_actions', ['form_instance_id', 'created_at']),
+]
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name == 'postgresql':
+        # Build without blocking writers on the audit tables
+        with op.get_context().autocommit_block():
+            for name, table, columns in NEW_INDEXES:
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                    f"ON {table} ({', '.join(columns)})"
+                )
+    else:
+        for name, table, columns in NEW_INDEXES:
+            op.create_index(name, table, columns)
+
+    # Leading column of both change_events composites
+    op.drop_index('ix_change_events_form_instance_id', table_name='change_events')
+
+
+def downgrade() -> None:
+    op.create_index('ix_change_events_form_instance_id', 'change_events', ['form_instance_id'])
+    for name, table, _ in reversed(NEW_INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,91 @@
+"""Hash-partition change_events by form_instance_id
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '004'
+down_revision: Union[str, None] = '003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITION_COUNT = 16
+
+CHANGE_EVENT_FOREIGN_KEYS = [
+    ('change_events_form_instance_id_fkey', 'form_instances', 'form_instance_id'),
+    ('change_events_version_id_fkey', 'form_versions', 'version_id'),
+    ('change_events_user_id_fkey', 'users', 'user_id'),
+]
+
+CHANGE_EVENT_INDEXES = [
+    ('ix_change_events_version_id', ['version_id']),
+    ('ix_change_events_user_id', ['user_id']),
+    ('ix_change_events_field_id', ['field_id']),
+    ('ix_change_events_form_ts', ['form_instance_id', 'timestamp']),
+    ('ix_change_events_form_field', ['form_instance_id', 'field_id']),
+]
+
+
+def _drop_indexes() -> None:
+    for name, _ in CHANGE_EVENT_INDEXES:
+        op.drop_index(name, table_name='change_events')
+
+
+def _rebuild_change_events(partitioned: bool) -> None:
+    """
+    Recreate change_events with the same columns and copy its rows over.
+
+    The existing table is renamed aside, so its rows, id sequence and
+    constraints survive until the copy has finished.
+    """
+    old = 'change_events_partitioned' if not partitioned else 'change_events_unpartitioned'
+
+    _drop_indexes()
+    op.rename_table('change_events', old)
+    op.execute(f"ALTER TABLE {old} RENAME CONSTRAINT change_events_pkey TO {old}_pkey")
+
+    partition_clause = " PARTITION BY HASH (form_instance_id)" if partitioned else ""
+    op.execute(f"CREATE TABLE change_events (LIKE {old} INCLUDING DEFAULTS){partition_clause}")
+
+    # The partition key must be part of the primary key
+    pk_columns = ['id', 'form_instance_id'] if partitioned else ['id']
+    op.create_primary_key('change_events_pkey', 'change_events', pk_columns)
+    for name, referent, column in CHANGE_EVENT_FOREIGN_KEYS:
+        op.drop_constraint(name, old, type_='foreignkey')
+        op.create_foreign_key(name, 'change_events', referent, [column], ['id'])
+
+    if partitioned:
+        for i in range(PARTITION_COUNT):
+            op.execute(
+                f"CREATE TABLE change_events_p{i} PARTITION OF change_events "
+                f"FOR VALUES WITH (MODULUS {PARTITION_COUNT}, REMAINDER {i})"
+            )
+
+    op.execute(f"INSERT INTO change_events SELECT * FROM {old}")
+    op.execute("ALTER SEQUENCE change_events_id_seq OWNED BY change_events.id")
+    op.execute(f"DROP TABLE {old} CASCADE")
+
+    # Indexes on a partitioned parent are created on every partition
+    for name, columns in CHANGE_EVENT_INDEXES:
+        op.create_index(name, 'change_events', columns)
+
+
+def upgrade() -> None:
+    # Declarative partitioning is PostgreSQL-only; other dialects keep the plain table
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    _rebuild_change_events(partitioned=True)
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    _rebuild_change_events(partitioned=False)
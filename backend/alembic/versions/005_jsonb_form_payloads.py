@@ -0,0 +1,64 @@
+"""Store form payloads as JSONB on PostgreSQL
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+JSONB_COLUMNS = [
+    ('form_data', 'data', False),
+    ('form_versions', 'data_snapshot', False),
+    ('change_events', 'old_value', True),
+    ('change_events', 'new_value', True),
+]
+
+
+def upgrade() -> None:
+    # JSONB is PostgreSQL-only; other dialects keep JSON
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    for table, column, nullable in JSONB_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=postgresql.JSONB(astext_type=sa.Text()),
+            existing_type=sa.JSON(),
+            existing_nullable=nullable,
+            postgresql_using=f"{column}::jsonb",
+        )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_form_data_data_gin "
+            "ON form_data USING gin (data jsonb_path_ops)"
+        )
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_form_data_data_gin', table_name='form_data')
+    for table, column, nullable in reversed(JSONB_COLUMNS):
+        op.alter_column(
+            table,
+            column,
+            type_=sa.JSON(),
+            existing_type=postgresql.JSONB(astext_type=sa.Text()),
+            existing_nullable=nullable,
+            postgresql_using=f"{column}::json",
+        )
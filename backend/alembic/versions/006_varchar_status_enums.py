@@ -0,0 +1,72 @@
+"""Store workflow enums as VARCHAR with CHECK constraints
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ENUM_TYPES = {
+    'formstatus': ['draft', 'in_review', 'needs_changes', 'approved', 'locked'],
+    'reviewactiontype': ['submit_for_review', 'request_changes', 'approve', 'reject', 'return_to_draft'],
+}
+
+ENUM_COLUMNS = [
+    ('form_instances', 'status', 'formstatus'),
+    ('form_versions', 'status_at_creation', 'formstatus'),
+    ('review_actions', 'action_type', 'reviewactiontype'),
+]
+
+
+def upgrade() -> None:
+    # Only PostgreSQL has native enum types; elsewhere these are already strings
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    for table, column, type_name in ENUM_COLUMNS:
+        op.alter_column(
+            table,
+            column,
+            type_=sa.String(20),
+            existing_nullable=False,
+            postgresql_using=f"{column}::text",
+        )
+        op.create_check_constraint(
+            type_name,
+            table,
+            sa.column(column).in_(ENUM_TYPES[type_name]),
+        )
+
+    # New values can now be added by replacing a CHECK constraint,
+    # instead of ALTER TYPE ... ADD VALUE outside a transaction
+    for type_name in ENUM_TYPES:
+        op.execute(f"DROP TYPE IF EXISTS {type_name}")
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    for type_name, values in ENUM_TYPES.items():
+        sa.Enum(*values, name=type_name).create(op.get_bind(), checkfirst=True)
+
+    for table, column, type_name in ENUM_COLUMNS:
+        op.drop_constraint(type_name, table, type_='check')
+        op.alter_column(
+            table,
+            column,
+            type_=sa.Enum(*ENUM_TYPES[type_name], name=type_name, create_type=False),
+            existing_nullable=False,
+            postgresql_using=f"{column}::{type_name}",
+        )
@@ -0,0 +1,86 @@
+"""Timezone-aware timestamps with server-side defaults
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, nullable, has server default)
+TIMESTAMP_COLUMNS = [
+    ('users', 'created_at', True, True),
+    ('users', 'updated_at', True, False),
+    ('templates', 'created_at', True, True),
+    ('templates', 'updated_at', True, False),
+    ('form_instances', 'created_at', True, True),
+    ('form_instances', 'updated_at', True, False),
+    ('form_instances', 'submitted_at', True, False),
+    ('form_versions', 'created_at', True, True),
+    ('form_data', 'updated_at', True, True),
+    ('change_events', 'timestamp', False, True),
+    ('comment_threads', 'created_at', True, True),
+    ('comment_threads', 'resolved_at', True, False),
+    ('comments', 'created_at', True, True),
+    ('comments', 'updated_at', True, False),
+    ('review_actions', 'created_at', True, True),
+]
+
+
+def upgrade() -> None:
+    is_postgresql = op.get_context().dialect.name == 'postgresql'
+
+    for table, column, nullable, has_default in TIMESTAMP_COLUMNS:
+        if is_postgresql:
+            # Existing values were written as naive UTC
+            op.alter_column(
+                table,
+                column,
+                type_=sa.DateTime(timezone=True),
+                existing_type=sa.DateTime(),
+                existing_nullable=nullable,
+                server_default=sa.text('now()') if has_default else None,
+                postgresql_using=f'"{column}" AT TIME ZONE \'UTC\'',
+            )
+        elif has_default:
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.DateTime(),
+                    existing_nullable=nullable,
+                    server_default=sa.text('CURRENT_TIMESTAMP'),
+                )
+
+
+def downgrade() -> None:
+    is_postgresql = op.get_context().dialect.name == 'postgresql'
+
+    for table, column, nullable, has_default in reversed(TIMESTAMP_COLUMNS):
+        if is_postgresql:
+            op.alter_column(
+                table,
+                column,
+                type_=sa.DateTime(),
+                existing_type=sa.DateTime(timezone=True),
+                existing_nullable=nullable,
+                server_default=None,
+                postgresql_using=f'"{column}" AT TIME ZONE \'UTC\'',
+            )
+        elif has_default:
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.DateTime(),
+                    existing_nullable=nullable,
+                    server_default=None,
+                )
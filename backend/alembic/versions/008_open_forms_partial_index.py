@@ -0,0 +1,40 @@
+"""Partial index for in-progress forms per owner
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_STATUSES = "status IN ('draft', 'in_review', 'needs_changes')"
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_form_instances_status_open "
+                f"ON form_instances (owner_id, status) WHERE {OPEN_STATUSES}"
+            )
+    else:
+        op.create_index(
+            'ix_form_instances_status_open',
+            'form_instances',
+            ['owner_id', 'status'],
+            sqlite_where=sa.text(OPEN_STATUSES),
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_form_instances_status_open', table_name='form_instances')
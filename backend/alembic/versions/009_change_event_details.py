@@ -0,0 +1,58 @@
+"""Move request metadata out of change_events into a sidecar table
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'change_event_details',
+        sa.Column('change_event_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('form_instance_id', sa.Integer(), nullable=False),
+        sa.Column('ip_address', sa.String(45), nullable=True),
+        sa.Column('user_agent', sa.String(512), nullable=True),
+        sa.ForeignKeyConstraint(['form_instance_id'], ['form_instances.id']),
+        sa.PrimaryKeyConstraint('change_event_id'),
+        sa.Index('ix_change_event_details_form_instance_id', 'form_instance_id')
+    )
+    
+    op.execute(
+        "INSERT INTO change_event_details (change_event_id, form_instance_id, ip_address, user_agent) "
+        "SELECT id, form_instance_id, ip_address, user_agent FROM change_events "
+        "WHERE ip_address IS NOT NULL OR user_agent IS NOT NULL"
+    )
+    
+    with op.batch_alter_table('change_events') as batch_op:
+        batch_op.drop_column('user_agent')
+        batch_op.drop_column('ip_address')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('change_events') as batch_op:
+        batch_op.add_column(sa.Column('ip_address', sa.String(45), nullable=True))
+        batch_op.add_column(sa.Column('user_agent', sa.String(512), nullable=True))
+    
+    op.execute(
+        "UPDATE change_events SET "
+        "ip_address = (SELECT d.ip_address FROM change_event_details d "
+        "WHERE d.change_event_id = change_events.id), "
+        "user_agent = (SELECT d.user_agent FROM change_event_details d "
+        "WHERE d.change_event_id = change_events.id) "
+        "WHERE id IN (SELECT change_event_id FROM change_event_details)"
+    )
+    
+    op.drop_table('change_event_details')
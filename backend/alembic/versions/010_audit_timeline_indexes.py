@@ -0,0 +1,64 @@
+"""Ordered timeline and per-user indexes for the audit log
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITION_COUNT = 16
+
+NEW_INDEXES = [
+    ('ix_change_events_form_ts', ['form_instance_id', 'timestamp DESC', 'id DESC']),
+    ('ix_change_events_form_user', ['form_instance_id', 'user_id']),
+]
+
+
+def _create_partitioned_index(name: str, columns: str) -> None:
+    """
+    Build an index on the hash-partitioned change_events without blocking writes.
+
+    CONCURRENTLY is not allowed on a partitioned parent, so the parent index is
+    created ON ONLY (invalid until complete), each partition is indexed
+    concurrently, and the partition indexes are then attached.
+    """
+    op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY change_events ({columns})")
+    with op.get_context().autocommit_block():
+        for i in range(PARTITION_COUNT):
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name}_p{i} "
+                f"ON change_events_p{i} ({columns})"
+            )
+    for i in range(PARTITION_COUNT):
+        op.execute(f"ALTER INDEX {name} ATTACH PARTITION {name}_p{i}")
+
+
+def upgrade() -> None:
+    # The old (form_instance_id, timestamp) index is replaced by an ordered one
+    # that includes the id tiebreaker; while it builds, form lookups still use
+    # ix_change_events_form_field.
+    op.drop_index('ix_change_events_form_ts', table_name='change_events')
+
+    if op.get_context().dialect.name == 'postgresql':
+        for name, columns in NEW_INDEXES:
+            _create_partitioned_index(name, ', '.join(columns))
+    else:
+        for name, columns in NEW_INDEXES:
+            op.create_index(name, 'change_events', [sa.text(column) for column in columns])
+
+
+def downgrade() -> None:
+    for name, _ in reversed(NEW_INDEXES):
+        op.drop_index(name, table_name='change_events')
+    op.create_index('ix_change_events_form_ts', 'change_events', ['form_instance_id', 'timestamp'])
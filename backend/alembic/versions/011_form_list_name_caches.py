@@ -0,0 +1,36 @@
+"""Denormalize template and owner names onto form_instances
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('form_instances', sa.Column('template_name_cache', sa.String(length=255), nullable=True))
+    op.add_column('form_instances', sa.Column('owner_name_cache', sa.String(length=255), nullable=True))
+
+    # Correlated subqueries work on both PostgreSQL and SQLite
+    op.execute(
+        "UPDATE form_instances SET "
+        "template_name_cache = (SELECT name FROM templates WHERE templates.id = form_instances.template_id), "
+        "owner_name_cache = (SELECT full_name FROM users WHERE users.id = form_instances.owner_id)"
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('form_instances') as batch_op:
+        batch_op.drop_column('owner_name_cache')
+        batch_op.drop_column('template_name_cache')
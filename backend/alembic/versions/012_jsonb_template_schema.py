@@ -0,0 +1,55 @@
+"""Store template schemas as JSONB on PostgreSQL
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '012'
+down_revision: Union[str, None] = '011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # JSONB is PostgreSQL-only; other dialects keep JSON
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    op.alter_column(
+        'templates',
+        'schema',
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        existing_type=sa.JSON(),
+        existing_nullable=False,
+        postgresql_using="schema::jsonb",
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_templates_schema_gin "
+            "ON templates USING gin (schema jsonb_path_ops)"
+        )
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    op.drop_index('ix_templates_schema_gin', table_name='templates')
+    op.alter_column(
+        'templates',
+        'schema',
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(astext_type=sa.Text()),
+        existing_nullable=False,
+        postgresql_using="schema::json",
+    )
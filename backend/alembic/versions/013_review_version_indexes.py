@@ -0,0 +1,57 @@
+"""Composite indexes for comment thread and version listings
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '013'
+down_revision: Union[str, None] = '012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (new index, table, columns, single-column index it makes redundant)
+INDEXES = [
+    (
+        'ix_comment_threads_form_resolved',
+        'comment_threads',
+        ['form_instance_id', 'is_resolved', 'created_at DESC', 'id DESC'],
+        'ix_comment_threads_form_instance_id',
+    ),
+    (
+        'ix_form_versions_form_number',
+        'form_versions',
+        ['form_instance_id', 'version_number DESC'],
+        'ix_form_versions_form_instance_id',
+    ),
+]
+
+
+def upgrade() -> None:
+    # review_actions already has ix_review_actions_form_created, which the
+    # history query scans backwards for its created_at DESC order
+    if op.get_context().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, columns, replaced in INDEXES:
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                    f"ON {table} ({', '.join(columns)})"
+                )
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {replaced}")
+    else:
+        for name, table, columns, replaced in INDEXES:
+            op.create_index(name, table, [sa.text(column) for column in columns])
+            op.drop_index(replaced, table_name=table)
+
+
+def downgrade() -> None:
+    for name, table, _, replaced in reversed(INDEXES):
+        op.create_index(replaced, table, ['form_instance_id'])
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,71 @@
+"""Rollup tables for the form activity summary
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '014'
+down_revision: Union[str, None] = '013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'form_activity_stats',
+        sa.Column('form_instance_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('total_changes', sa.Integer(), nullable=False),
+        sa.Column('first_activity', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('last_activity', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.ForeignKeyConstraint(['form_instance_id'], ['form_instances.id']),
+        sa.PrimaryKeyConstraint('form_instance_id')
+    )
+    op.create_table(
+        'form_user_stats',
+        sa.Column('form_instance_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('user_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('change_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['form_instance_id'], ['form_instances.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('form_instance_id', 'user_id')
+    )
+    op.create_table(
+        'form_field_stats',
+        sa.Column('form_instance_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('field_id', sa.String(255), nullable=False),
+        sa.Column('change_count', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['form_instance_id'], ['form_instances.id']),
+        sa.PrimaryKeyConstraint('form_instance_id', 'field_id'),
+        sa.Index('ix_form_field_stats_form_count', 'form_instance_id', sa.text('change_count DESC'))
+    )
+    
+    # Backfill from the existing audit log
+    op.execute(
+        "INSERT INTO form_activity_stats (form_instance_id, total_changes, first_activity, last_activity) "
+        "SELECT form_instance_id, COUNT(*), MIN(timestamp), MAX(timestamp) "
+        "FROM change_events GROUP BY form_instance_id"
+    )
+    op.execute(
+        "INSERT INTO form_user_stats (form_instance_id, user_id, change_count) "
+        "SELECT form_instance_id, user_id, COUNT(*) "
+        "FROM change_events GROUP BY form_instance_id, user_id"
+    )
+    op.execute(
+        "INSERT INTO form_field_stats (form_instance_id, field_id, change_count) "
+        "SELECT form_instance_id, field_id, COUNT(*) "
+        "FROM change_events WHERE field_id != '_system' GROUP BY form_instance_id, field_id"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('form_field_stats')
+    op.drop_table('form_user_stats')
+    op.drop_table('form_activity_stats')
@@ -0,0 +1,50 @@
+"""Document generation jobs
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '015'
+down_revision: Union[str, None] = '014'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'document_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('form_instance_id', sa.Integer(), nullable=False),
+        sa.Column('version_id', sa.Integer(), nullable=True),
+        sa.Column('requested_by_id', sa.Integer(), nullable=False),
+        sa.Column(
+            'status',
+            sa.Enum('pending', 'running', 'done', 'failed',
+                    name='documentjobstatus', native_enum=False, length=20,
+                    create_constraint=True),
+            nullable=False
+        ),
+        sa.Column('docx_path', sa.String(512), nullable=True),
+        sa.Column('pdf_path', sa.String(512), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['form_instance_id'], ['form_instances.id']),
+        sa.ForeignKeyConstraint(['version_id'], ['form_versions.id']),
+        sa.ForeignKeyConstraint(['requested_by_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_document_jobs_form_instance_id', 'document_jobs', ['form_instance_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_document_jobs_form_instance_id', table_name='document_jobs')
+    op.drop_table('document_jobs')
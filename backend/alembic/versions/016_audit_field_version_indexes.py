@@ -0,0 +1,66 @@
+"""Ordered field history and version change indexes for the audit log
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-16
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '016'
+down_revision: Union[str, None] = '015'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITION_COUNT = 16
+
+# Field history and version changes filter by form plus field or version and
+# read oldest first, with id breaking timestamp ties
+NEW_INDEXES = [
+    ('ix_change_events_form_field_ts', ['form_instance_id', 'field_id', 'timestamp', 'id']),
+    ('ix_change_events_form_version', ['form_instance_id', 'version_id', 'timestamp', 'id']),
+]
+
+
+def _create_partitioned_index(name: str, columns: str) -> None:
+    """
+    Build an index on the hash-partitioned change_events without blocking writes.
+
+    See migration 010: the parent index is created ON ONLY, each partition is
+    indexed concurrently, and the partition indexes are then attached.
+    """
+    op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY change_events ({columns})")
+    with op.get_context().autocommit_block():
+        for i in range(PARTITION_COUNT):
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name}_p{i} "
+                f"ON change_events_p{i} ({columns})"
+            )
+    for i in range(PARTITION_COUNT):
+        op.execute(f"ALTER INDEX {name} ATTACH PARTITION {name}_p{i}")
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name == 'postgresql':
+        for name, columns in NEW_INDEXES:
+            _create_partitioned_index(name, ', '.join(columns))
+    else:
+        for name, columns in NEW_INDEXES:
+            op.create_index(name, 'change_events', columns)
+
+    # (form_instance_id, field_id) is a prefix of the new field index
+    op.drop_index('ix_change_events_form_field', table_name='change_events')
+
+    # Refresh planner statistics so the new indexes are picked up straight away
+    op.execute("ANALYZE change_events")
+
+
+def downgrade() -> None:
+    op.create_index('ix_change_events_form_field', 'change_events', ['form_instance_id', 'field_id'])
+    for name, _ in reversed(NEW_INDEXES):
+        op.drop_index(name, table_name='change_events')
@@ -1,8 +1,10 @@
 """Application configuration using Pydantic Settings."""
 
-from functools import lru_cache
-from typing import List
+import os
+from functools import cached_property, lru_cache
+from typing import Literal, Optional, Tuple
 
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 
 
@@ -12,10 +14,25 @@ class Settings(BaseSettings):
     # Database (defaults to SQLite for local dev, use PostgreSQL in production)
     database_url: str = "sqlite:///./irb_forms.db"
     
+    # Connection pool (ignored for SQLite)
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_recycle: int = 1800  # seconds
+    db_pool_timeout: int = 10  # seconds
+    db_pool_use_lifo: bool = True
+    # Set when DATABASE_URL points at PgBouncer in transaction pooling mode;
+    # PgBouncer then does the pooling and the db_pool_* settings are ignored
+    db_use_pgbouncer: bool = False
+    
+    # Worker threads for sync endpoints; sized to db_pool_size + db_max_overflow
+    threadpool_size: int = 60
+    
     # Authentication
     secret_key: str = "dev-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 1440  # 24 hours
+    # bcrypt cost factor for new hashes; calibrate to ~250 ms per hash
+    bcrypt_rounds: int = 12
     
     # CORS origins (comma-separated)
     cors_origins: str = "http://localhost:5173,http://localhost:3000,https://irb-forms-frontend.onrender.com"
@@ -25,16 +42,50 @@ class Settings(BaseSettings):
     generated_dir: str = "./storage/generated"
     template_dir: str = "./storage/templates"
     
+    # Largest template DOCX accepted for upload
+    max_template_upload_mb: int = 25
+    # Worker processes for parsing uploaded templates; 0 means one per CPU
+    template_parse_workers: int = 0
+    
+    # Generated document storage: "local" serves files from generated_dir,
+    # "s3" uploads them to s3_bucket and redirects downloads to presigned URLs
+    storage_backend: Literal["local", "s3"] = "local"
+    s3_bucket: str = ""
+    s3_presign_expires: int = 900  # seconds
+    
+    # Optional Redis cache (disabled when unset)
+    redis_url: Optional[str] = None
+    form_meta_cache_ttl: int = 60  # seconds
+    user_cache_ttl: int = 60  # seconds
+    audit_count_cache_ttl: int = 60  # seconds
+    # In-process cache of the published template list
+    published_templates_cache_ttl: int = 30  # seconds
+    
     # LibreOffice
     libreoffice_path: str = "/usr/bin/soffice"
+    # PDF conversions run at once per app process, each with its own profile
+    # (and, with libreoffice_uno, its own soffice listener)
+    libreoffice_workers: int = 2
+    # Convert through a long-running soffice listener over UNO instead of
+    # starting soffice per document; needs LibreOffice's Python uno module
+    libreoffice_uno: bool = False
+    # Render each new version snapshot's DOCX/PDF right after it is created.
+    # Off by default: versions are otherwise rendered on first download.
+    prerender_version_documents: bool = False
     
     # Debug mode
     debug: bool = True
     
-    @property
-    def cors_origins_list(self) -> List[str]:
-        """Parse CORS origins from comma-separated string."""
-        return [origin.strip() for origin in self.cors_origins.split(",")]
+    @field_validator("upload_dir", "generated_dir", "template_dir")
+    @classmethod
+    def resolve_storage_dir(cls, value: str) -> str:
+        """Resolve storage paths once so later path joins don't depend on the cwd."""
+        return os.path.abspath(value)
+    
+    @cached_property
+    def cors_origins_list(self) -> Tuple[str, ...]:
+        """Parse CORS origins from comma-separated string (computed once)."""
+        return tuple(origin.strip() for origin in self.cors_origins.split(","))
     
     class Config:
         env_file = ".env"
@@ -1,42 +1,91 @@
 """Database configuration and session management."""
 
-from sqlalchemy import create_engine
+import orjson
+from sqlalchemy import create_engine, event, JSON
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import NullPool
 
 from app.config import get_settings
 
 
 settings = get_settings()
 
+
+def _json_dumps(value) -> str:
+    """Serialize a JSON column value with orjson; int keys become strings like json.dumps."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
 # Handle SQLite vs PostgreSQL connection args
 connect_args = {}
 engine_kwargs = {}
 
 if settings.database_url.startswith("sqlite"):
     connect_args = {"check_same_thread": False}
+elif settings.db_use_pgbouncer:
+    # A pool per worker in front of PgBouncer would pin server connections
+    # across workers; open a client connection per checkout instead
+    engine_kwargs = {"poolclass": NullPool}
 else:
     engine_kwargs = {
         "pool_pre_ping": True,
-        "pool_size": 10,
-        "max_overflow": 20,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_timeout": settings.db_pool_timeout,
+        # Reuse the most recent connection so idle ones can age out
+        "pool_use_lifo": settings.db_pool_use_lifo,
     }
 
 engine = create_engine(
     settings.database_url,
     connect_args=connect_args,
+    # Rows per multi-row INSERT page for batched writes such as ChangeEvent.bulk_log
+    insertmanyvalues_page_size=1000,
+    # Room for every distinct statement shape the app compiles
+    query_cache_size=1200,
+    # JSON columns (schemas, form data, snapshots, audit values) are
+    # (de)serialized on every row; orjson is several times faster than json
+    json_serializer=_json_dumps,
+    json_deserializer=orjson.loads,
     **engine_kwargs
 )
 
+if settings.database_url.startswith("sqlite"):
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """Use WAL so readers don't block on writers, and relax per-commit fsync."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB
+        cursor.execute("PRAGMA cache_size=-65536")  # 64 MB
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+# JSON document column: binary, GIN-indexable JSONB on PostgreSQL, plain JSON elsewhere
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
+
 class Base(DeclarativeBase):
     """Base class for all SQLAlchemy models."""
     pass
 
 
 def get_db():
-    """Dependency that provides a database session."""
+    """
+    Dependency that provides a database session.
+    
+    Services commit their own writes before returning, and since FastAPI
+    0.106 the cleanup below runs before the response is sent, so a client
+    never sees a 2xx for an uncommitted write and no worker holds a session
+    while the response streams.
+    """
     db = SessionLocal()
     try:
         yield db
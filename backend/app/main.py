@@ -1,19 +1,57 @@
 """FastAPI application entry point."""
 
+from contextlib import asynccontextmanager
+import asyncio
+import os
+
+import anyio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
-import os
+from sqlalchemy.pool import QueuePool
 
 from app.config import get_settings
+from app.database import engine
 from app.routers import auth, templates, forms, versions, audit, review, export
+from app.services.document import DocumentService
+from app.services.process_pool import ProcessPool
+from app.services.storage import StorageService
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Ensure storage directories exist and size the threadpool before serving requests."""
+    # Sync endpoints hold a worker thread while they wait on the database;
+    # allow as many threads as there are pooled connections
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+    
+    # mkdir can be a network round trip on shared volumes; keep it off the loop
+    await asyncio.gather(*[
+        asyncio.to_thread(os.makedirs, dir_path, exist_ok=True)
+        for dir_path in [settings.upload_dir, settings.generated_dir, settings.template_dir]
+    ])
+    
+    # Template parsing is pure-Python CPU work; separate processes keep it
+    # from holding the GIL while other requests are served
+    app.state.cpu_pool = ProcessPool(settings.template_parse_workers or os.cpu_count())
+    try:
+        yield
+    finally:
+        app.state.cpu_pool.shutdown()
+        await asyncio.to_thread(DocumentService.stop_libreoffice)
+
+
 app = FastAPI(
     title="IRB Forms Management System",
     description="Smart online forms with conditional sections, versioning, review workflow, and document generation",
     version="1.0.0",
+    lifespan=lifespan,
+    # Responses carry large nested payloads (form data, version snapshots,
+    # audit values); orjson encodes them far faster than json.dumps
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware
@@ -34,13 +72,16 @@ app.include_router(audit.router, prefix="/api/audit", tags=["Audit Trail"])
 app.include_router(review.router, prefix="/api/review", tags=["Review Workflow"])
 app.include_router(export.router, prefix="/api/export", tags=["Document Export"])
 
-# Ensure storage directories exist
-for dir_path in [settings.upload_dir, settings.generated_dir, settings.template_dir]:
-    os.makedirs(dir_path, exist_ok=True)
-
-# Mount static files for generated documents (protected in production)
-if os.path.exists(settings.generated_dir):
-    app.mount("/generated", StaticFiles(directory=settings.generated_dir), name="generated")
+# Generated documents are served from disk in local debug only. With object
+# storage there is no /generated route: presigned URLs are handed out only by
+# the export endpoints, after their form access checks.
+if settings.debug and not StorageService.is_remote():
+    # The directory is created by the lifespan handler, so skip the import-time check
+    app.mount(
+        "/generated",
+        StaticFiles(directory=settings.generated_dir, check_dir=False),
+        name="generated",
+    )
 
 
 @app.get("/health")
@@ -49,6 +90,21 @@ async def health_check():
     return {"status": "healthy", "service": "irb-forms-backend"}
 
 
+@app.get("/healthz")
+async def health_check_pool():
+    """Health check with database connection pool usage, for capacity planning."""
+    pool = engine.pool
+    pool_stats = {"status": pool.status()}
+    if isinstance(pool, QueuePool):
+        pool_stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    return {"status": "healthy", "service": "irb-forms-backend", "pool": pool_stats}
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -3,8 +3,15 @@
 from app.models.user import User
 from app.models.template import Template
 from app.models.form import FormInstance, FormVersion, FormData
-from app.models.audit import ChangeEvent
+from app.models.audit import (
+    ChangeEvent,
+    ChangeEventDetail,
+    FormActivityStats,
+    FormUserStats,
+    FormFieldStats,
+)
 from app.models.review import CommentThread, Comment, ReviewAction
+from app.models.document import DocumentJob
 
 __all__ = [
     "User",
@@ -13,7 +20,12 @@ __all__ = [
     "FormVersion",
     "FormData",
     "ChangeEvent",
+    "ChangeEventDetail",
+    "FormActivityStats",
+    "FormUserStats",
+    "FormFieldStats",
     "CommentThread",
     "Comment",
     "ReviewAction",
+    "DocumentJob",
 ]
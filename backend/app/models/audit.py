@@ -1,12 +1,17 @@
 """Audit trail model for tracking all changes."""
 
+from collections import Counter
 from datetime import datetime
-from typing import Optional, Any
+from typing import Optional, Any, List, Iterator
 
-from sqlalchemy import String, Text, DateTime, ForeignKey, JSON
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import (
+    Connection, String, Text, DateTime, ForeignKey, Index, Integer, event, insert, select, func, text
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Mapped, mapped_column, relationship, Session
 
-from app.database import Base
+from app.database import Base, JSONType
 
 
 class ChangeEvent(Base):
@@ -18,14 +23,24 @@ class ChangeEvent(Base):
     """
     
     __tablename__ = "change_events"
+    # On PostgreSQL the table is hash-partitioned by form_instance_id with a
+    # (id, form_instance_id) primary key; see migration 004.
+    __table_args__ = (
+        # Audit timelines filter by form and order newest first (id breaks
+        # timestamp ties), or filter by form and user. Field history and
+        # version changes filter by form and field or version, oldest first.
+        Index("ix_change_events_form_ts", "form_instance_id", text("timestamp DESC"), text("id DESC")),
+        Index("ix_change_events_form_field_ts", "form_instance_id", "field_id", "timestamp", "id"),
+        Index("ix_change_events_form_version", "form_instance_id", "version_id", "timestamp", "id"),
+        Index("ix_change_events_form_user", "form_instance_id", "user_id"),
+    )
     
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     
     # Form instance reference
     form_instance_id: Mapped[int] = mapped_column(
         ForeignKey("form_instances.id"), 
-        nullable=False,
-        index=True
+        nullable=False
     )
     
     # Version reference (which version this change belongs to)
@@ -47,19 +62,15 @@ class ChangeEvent(Base):
     field_label: Mapped[Optional[str]] = mapped_column(String(512), nullable=True)
     
     # Change details
-    old_value: Mapped[Optional[Any]] = mapped_column(JSON, nullable=True)
-    new_value: Mapped[Optional[Any]] = mapped_column(JSON, nullable=True)
+    old_value: Mapped[Optional[Any]] = mapped_column(JSONType, nullable=True)
+    new_value: Mapped[Optional[Any]] = mapped_column(JSONType, nullable=True)
     
     # Action type for non-field changes
     action_type: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
     action_details: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     
     # Timestamp (immutable)
-    timestamp: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
-    
-    # IP address and user agent for additional audit info
-    ip_address: Mapped[Optional[str]] = mapped_column(String(45), nullable=True)
-    user_agent: Mapped[Optional[str]] = mapped_column(String(512), nullable=True)
+    timestamp: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     
     # Relationships
     form_instance: Mapped["FormInstance"] = relationship("FormInstance")
@@ -68,10 +79,74 @@ class ChangeEvent(Base):
         back_populates="change_events"
     )
     user: Mapped["User"] = relationship("User", back_populates="change_events")
+    details: Mapped[Optional["ChangeEventDetail"]] = relationship(
+        "ChangeEventDetail",
+        primaryjoin="ChangeEvent.id == foreign(ChangeEventDetail.change_event_id)",
+        uselist=False,
+        viewonly=True
+    )
     
     def __repr__(self) -> str:
         return f"<ChangeEvent(id={self.id}, field='{self.field_id}', user_id={self.user_id})>"
     
+    @classmethod
+    def bulk_log(cls, session: Session, events: List[dict]) -> None:
+        """
+        Insert many change events with a single batched INSERT.
+        
+        Rows are sent as multi-row VALUES pages rather than one statement
+        per event. ip_address/user_agent keys are written to the
+        change_event_details sidecar. The caller owns the transaction and
+        commits it.
+        """
+        if not events:
+            return
+        
+        rows = [
+            {k: v for k, v in event.items() if k not in DETAIL_FIELDS}
+            for event in events
+        ]
+        record_activity(session.connection(), events)
+        if not any(event.get(k) for event in events for k in DETAIL_FIELDS):
+            session.execute(insert(cls), rows)
+            return
+        
+        ids = session.scalars(
+            insert(cls).returning(cls.id, sort_by_parameter_order=True),
+            rows
+        ).all()
+        details = [
+            {
+                "change_event_id": event_id,
+                "form_instance_id": event["form_instance_id"],
+                **{k: event.get(k) for k in DETAIL_FIELDS},
+            }
+            for event_id, event in zip(ids, events)
+            if any(event.get(k) for k in DETAIL_FIELDS)
+        ]
+        session.execute(insert(ChangeEventDetail), details)
+    
+    @classmethod
+    def stream_for_form(
+        cls,
+        session: Session,
+        form_instance_id: int,
+        page_size: int = 1000
+    ) -> Iterator[dict]:
+        """
+        Yield a form's full audit trail, oldest first, as dictionaries.
+        
+        Rows are fetched page_size at a time (a server-side cursor on
+        PostgreSQL), so memory stays flat however long the trail is.
+        """
+        stmt = select(cls).where(
+            cls.form_instance_id == form_instance_id
+        ).order_by(cls.timestamp.asc(), cls.id.asc())
+        
+        result = session.execute(stmt.execution_options(yield_per=page_size))
+        for event in result.scalars():
+            yield event.to_dict()
+    
     def to_dict(self) -> dict:
         """Convert to dictionary for API responses."""
         return {
@@ -87,3 +162,154 @@ class ChangeEvent(Base):
             "action_details": self.action_details,
             "timestamp": self.timestamp.isoformat() if self.timestamp else None,
         }
+
+
+# Request metadata columns kept out of the change_events rows
+DETAIL_FIELDS = ("ip_address", "user_agent")
+
+
+class ChangeEventDetail(Base):
+    """
+    Request metadata for a ChangeEvent, stored in a sidecar table.
+    
+    The audit timeline never reads these columns, so keeping them out of
+    change_events keeps those rows narrow. There is no foreign key to
+    change_events: on PostgreSQL that table is partitioned and its id
+    alone is not a referenceable key.
+    """
+    
+    __tablename__ = "change_event_details"
+    
+    change_event_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    form_instance_id: Mapped[int] = mapped_column(
+        ForeignKey("form_instances.id"),
+        nullable=False,
+        index=True
+    )
+    
+    # IP address and user agent for additional audit info
+    ip_address: Mapped[Optional[str]] = mapped_column(String(45), nullable=True)
+    user_agent: Mapped[Optional[str]] = mapped_column(String(512), nullable=True)
+    
+    def __repr__(self) -> str:
+        return f"<ChangeEventDetail(change_event_id={self.change_event_id})>"
+
+
+class FormActivityStats(Base):
+    """
+    Running totals of a form's change events, for the activity summary.
+    
+    Kept up to date by record_activity in the same transaction as each
+    ChangeEvent insert, so the summary never scans change_events.
+    """
+    
+    __tablename__ = "form_activity_stats"
+    
+    form_instance_id: Mapped[int] = mapped_column(
+        ForeignKey("form_instances.id"), primary_key=True, autoincrement=False
+    )
+    total_changes: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    first_activity: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    last_activity: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    
+    def __repr__(self) -> str:
+        return f"<FormActivityStats(form_instance_id={self.form_instance_id}, total={self.total_changes})>"
+
+
+class FormUserStats(Base):
+    """Change event count per form and user; see FormActivityStats."""
+    
+    __tablename__ = "form_user_stats"
+    
+    form_instance_id: Mapped[int] = mapped_column(
+        ForeignKey("form_instances.id"), primary_key=True, autoincrement=False
+    )
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id"), primary_key=True, autoincrement=False
+    )
+    change_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class FormFieldStats(Base):
+    """Change event count per form and field (system events excluded)."""
+    
+    __tablename__ = "form_field_stats"
+    __table_args__ = (
+        # Most edited fields of a form
+        Index("ix_form_field_stats_form_count", "form_instance_id", text("change_count DESC")),
+    )
+    
+    form_instance_id: Mapped[int] = mapped_column(
+        ForeignKey("form_instances.id"), primary_key=True, autoincrement=False
+    )
+    field_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    change_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+def _upsert_counts(
+    connection: Connection,
+    model: type,
+    keys: List[str],
+    count_column: str,
+    counts: Counter,
+    **extra_set: Any
+) -> None:
+    """Add counts to a rollup table with one INSERT ... ON CONFLICT DO UPDATE."""
+    dialect_insert = pg_insert if connection.dialect.name == "postgresql" else sqlite_insert
+    stmt = dialect_insert(model)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=keys,
+        set_={
+            count_column: getattr(model, count_column) + getattr(stmt.excluded, count_column),
+            **extra_set,
+        },
+    )
+    # Sorted, so concurrent writers lock rows in the same order
+    connection.execute(stmt, [
+        {**dict(zip(keys, key if isinstance(key, tuple) else (key,))), count_column: count}
+        for key, count in sorted(counts.items())
+    ])
+
+
+def record_activity(connection: Connection, events: List[dict]) -> None:
+    """
+    Add newly inserted change events to the activity rollup tables.
+    
+    Events are counted in Python first: one upsert per table, however many
+    events there are. Runs on the inserting connection, so the rollups
+    commit or roll back together with the events.
+    """
+    if not events:
+        return
+    
+    _upsert_counts(
+        connection, FormActivityStats, ["form_instance_id"], "total_changes",
+        Counter(e["form_instance_id"] for e in events),
+        last_activity=func.now(),
+    )
+    _upsert_counts(
+        connection, FormUserStats, ["form_instance_id", "user_id"], "change_count",
+        Counter((e["form_instance_id"], e["user_id"]) for e in events),
+    )
+    field_counts = Counter(
+        (e["form_instance_id"], e["field_id"]) for e in events if e["field_id"] != "_system"
+    )
+    if field_counts:
+        _upsert_counts(
+            connection, FormFieldStats, ["form_instance_id", "field_id"], "change_count",
+            field_counts,
+        )
+
+
+@event.listens_for(ChangeEvent, "after_insert")
+def _record_change_event_activity(mapper, connection, target: ChangeEvent) -> None:
+    """Count change events added through the ORM (bulk_log counts its own)."""
+    record_activity(connection, [{
+        "form_instance_id": target.form_instance_id,
+        "user_id": target.user_id,
+        "field_id": target.field_id,
+    }])
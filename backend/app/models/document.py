@@ -0,0 +1,69 @@
+"""Document generation job model."""
+
+from datetime import datetime
+from typing import Optional
+from enum import Enum as PyEnum
+
+from sqlalchemy import String, Text, DateTime, ForeignKey, Enum, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class DocumentJobStatus(str, PyEnum):
+    """Document generation job states."""
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class DocumentJob(Base):
+    """
+    DocumentJob tracks one DOCX/PDF generation run outside a request.
+    
+    A job renders either a version snapshot or, without version_id, the
+    form's current data. Clients poll it until it is done, then download
+    the files it produced.
+    """
+    
+    __tablename__ = "document_jobs"
+    
+    id: Mapped[int] = mapped_column(primary_key=True)
+    
+    # What to render
+    form_instance_id: Mapped[int] = mapped_column(
+        ForeignKey("form_instances.id"),
+        nullable=False,
+        index=True
+    )
+    version_id: Mapped[Optional[int]] = mapped_column(
+        ForeignKey("form_versions.id"),
+        nullable=True
+    )
+    requested_by_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    
+    status: Mapped[DocumentJobStatus] = mapped_column(
+        Enum(
+            DocumentJobStatus,
+            name="documentjobstatus",
+            native_enum=False,
+            length=20,
+            create_constraint=True,
+            values_callable=lambda x: [e.value for e in x],
+        ),
+        default=DocumentJobStatus.PENDING,
+        nullable=False
+    )
+    
+    # Output, or why there is none
+    docx_path: Mapped[Optional[str]] = mapped_column(String(512), nullable=True)
+    pdf_path: Mapped[Optional[str]] = mapped_column(String(512), nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    
+    # Timestamps
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    
+    def __repr__(self) -> str:
+        return f"<DocumentJob(id={self.id}, form_id={self.form_instance_id}, status='{self.status}')>"
@@ -4,10 +4,14 @@ from datetime import datetime
 from typing import Optional, List, Dict, Any
 from enum import Enum as PyEnum
 
-from sqlalchemy import String, Text, DateTime, ForeignKey, JSON, Enum, Integer
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import String, Text, DateTime, ForeignKey, Enum, Integer, Index, event, func, inspect, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Mapped, mapped_column, relationship, Session
 
-from app.database import Base
+from app.database import Base, JSONType
+from app.models.template import Template
+from app.models.user import User
 
 
 class FormStatus(str, PyEnum):
@@ -28,8 +32,18 @@ class FormInstance(Base):
     """
     
     __tablename__ = "form_instances"
+    __table_args__ = (
+        # Dashboards list a user's forms that are still in progress
+        Index(
+            "ix_form_instances_status_open",
+            "owner_id",
+            "status",
+            postgresql_where=text("status IN ('draft', 'in_review', 'needs_changes')"),
+            sqlite_where=text("status IN ('draft', 'in_review', 'needs_changes')"),
+        ),
+    )
     
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     
     # Template reference
     template_id: Mapped[int] = mapped_column(
@@ -48,7 +62,14 @@ class FormInstance(Base):
     # Form metadata
     title: Mapped[str] = mapped_column(String(512), nullable=False)
     status: Mapped[FormStatus] = mapped_column(
-        Enum('draft', 'in_review', 'needs_changes', 'approved', 'locked', name='formstatus', create_type=False),
+        Enum(
+            FormStatus,
+            name="formstatus",
+            native_enum=False,
+            length=20,
+            create_constraint=True,
+            values_callable=lambda x: [e.value for e in x],
+        ),
         default=FormStatus.DRAFT,
         nullable=False,
         index=True
@@ -57,17 +78,27 @@ class FormInstance(Base):
     # Current version number
     current_version_number: Mapped[int] = mapped_column(Integer, default=1)
     
+    # Copies of template.name and owner.full_name so form lists need no joins;
+    # kept in sync by the rename listeners at the end of this module
+    template_name_cache: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    owner_name_cache: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    
     # Timestamps
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[Optional[datetime]] = mapped_column(
-        DateTime, 
-        onupdate=datetime.utcnow,
+        DateTime(timezone=True), 
+        onupdate=func.now(),
         nullable=True
     )
-    submitted_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    submitted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     
     # Relationships
-    template: Mapped["Template"] = relationship("Template", back_populates="form_instances")
+    # All lazy; queries that show the template or owner (the form detail)
+    # join them explicitly with joinedload
+    template: Mapped["Template"] = relationship(
+        "Template",
+        back_populates="form_instances"
+    )
     owner: Mapped["User"] = relationship(
         "User", 
         back_populates="form_instances",
@@ -103,14 +134,17 @@ class FormVersion(Base):
     """
     
     __tablename__ = "form_versions"
+    __table_args__ = (
+        # A form's versions, latest first (also serves form_instance_id lookups)
+        Index("ix_form_versions_form_number", "form_instance_id", text("version_number DESC")),
+    )
     
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     
     # Form instance reference
     form_instance_id: Mapped[int] = mapped_column(
         ForeignKey("form_instances.id"), 
-        nullable=False,
-        index=True
+        nullable=False
     )
     
     # Version metadata
@@ -118,11 +152,18 @@ class FormVersion(Base):
     version_label: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
     
     # Snapshot of form data at this version
-    data_snapshot: Mapped[Dict[str, Any]] = mapped_column(JSON, nullable=False, default=dict)
+    data_snapshot: Mapped[Dict[str, Any]] = mapped_column(JSONType, nullable=False, default=dict)
     
     # Status when this version was created
     status_at_creation: Mapped[FormStatus] = mapped_column(
-        Enum('draft', 'in_review', 'needs_changes', 'approved', 'locked', name='formstatus', create_type=False),
+        Enum(
+            FormStatus,
+            name="formstatus",
+            native_enum=False,
+            length=20,
+            create_constraint=True,
+            values_callable=lambda x: [e.value for e in x],
+        ),
         nullable=False
     )
     
@@ -131,7 +172,7 @@ class FormVersion(Base):
     generated_pdf_path: Mapped[Optional[str]] = mapped_column(String(512), nullable=True)
     
     # Timestamps
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     created_by_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
     
     # Relationships
@@ -158,8 +199,17 @@ class FormData(Base):
     """
     
     __tablename__ = "form_data"
+    __table_args__ = (
+        # Containment (@>) lookups on field values; PostgreSQL only
+        Index(
+            "ix_form_data_data_gin",
+            "data",
+            postgresql_using="gin",
+            postgresql_ops={"data": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
     
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     
     # Form instance reference (one-to-one)
     form_instance_id: Mapped[int] = mapped_column(
@@ -170,13 +220,13 @@ class FormData(Base):
     )
     
     # Current field values as JSON
-    data: Mapped[Dict[str, Any]] = mapped_column(JSON, nullable=False, default=dict)
+    data: Mapped[Dict[str, Any]] = mapped_column(JSONType, nullable=False, default=dict)
     
     # Last modified
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime, 
-        default=datetime.utcnow,
-        onupdate=datetime.utcnow
+        DateTime(timezone=True), 
+        server_default=func.now(),
+        onupdate=func.now()
     )
     
     # Relationship
@@ -187,3 +237,43 @@ class FormData(Base):
     
     def __repr__(self) -> str:
         return f"<FormData(form_instance_id={self.form_instance_id})>"
+    
+    @classmethod
+    def upsert(cls, session: Session, form_instance_id: int, data: Dict[str, Any]) -> "FormData":
+        """
+        Insert or overwrite a form's working data in one statement.
+        
+        Uses INSERT ... ON CONFLICT (form_instance_id) DO UPDATE, so there
+        is no get-or-create race. Returns the session's FormData for the
+        form, refreshed with the stored row.
+        """
+        dialect_insert = pg_insert if session.get_bind().dialect.name == "postgresql" else sqlite_insert
+        stmt = dialect_insert(cls).values(form_instance_id=form_instance_id, data=data)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.form_instance_id],
+            set_={"data": stmt.excluded.data, "updated_at": func.now()},
+        ).returning(cls)
+        return session.scalars(stmt, execution_options={"populate_existing": True}).one()
+
+
+@event.listens_for(Template, "after_update")
+def _sync_template_name_cache(mapper, connection, target: Template) -> None:
+    """Copy a renamed template's name onto its form instances."""
+    if inspect(target).attrs.name.history.has_changes():
+        connection.execute(
+            update(FormInstance)
+            .where(FormInstance.template_id == target.id)
+            # Keep updated_at: a rename is not an edit of the form
+            .values(template_name_cache=target.name, updated_at=FormInstance.updated_at)
+        )
+
+
+@event.listens_for(User, "after_update")
+def _sync_owner_name_cache(mapper, connection, target: User) -> None:
+    """Copy a renamed user's full name onto the forms they own."""
+    if inspect(target).attrs.full_name.history.has_changes():
+        connection.execute(
+            update(FormInstance)
+            .where(FormInstance.owner_id == target.id)
+            .values(owner_name_cache=target.full_name, updated_at=FormInstance.updated_at)
+        )
@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional, List
 from enum import Enum as PyEnum
 
-from sqlalchemy import String, Text, DateTime, ForeignKey, Boolean, Enum
+from sqlalchemy import String, Text, DateTime, ForeignKey, Boolean, Enum, Index, func, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -27,14 +27,23 @@ class CommentThread(Base):
     """
     
     __tablename__ = "comment_threads"
+    __table_args__ = (
+        # A form's open threads, newest first (also serves form_instance_id lookups)
+        Index(
+            "ix_comment_threads_form_resolved",
+            "form_instance_id",
+            "is_resolved",
+            text("created_at DESC"),
+            text("id DESC"),
+        ),
+    )
     
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     
     # Form instance reference
     form_instance_id: Mapped[int] = mapped_column(
         ForeignKey("form_instances.id"), 
-        nullable=False,
-        index=True
+        nullable=False
     )
     
     # What the comment is about
@@ -43,14 +52,14 @@ class CommentThread(Base):
     
     # Thread status
     is_resolved: Mapped[bool] = mapped_column(Boolean, default=False)
-    resolved_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    resolved_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     resolved_by_id: Mapped[Optional[int]] = mapped_column(
         ForeignKey("users.id"), 
         nullable=True
     )
     
     # Timestamps
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     form_instance: Mapped["FormInstance"] = relationship(
@@ -73,7 +82,7 @@ class Comment(Base):
     
     __tablename__ = "comments"
     
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     
     # Thread reference
     thread_id: Mapped[int] = mapped_column(
@@ -93,10 +102,10 @@ class Comment(Base):
     content: Mapped[str] = mapped_column(Text, nullable=False)
     
     # Timestamps
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[Optional[datetime]] = mapped_column(
-        DateTime, 
-        onupdate=datetime.utcnow,
+        DateTime(timezone=True), 
+        onupdate=func.now(),
         nullable=True
     )
     
@@ -122,8 +131,11 @@ class ReviewAction(Base):
     """
     
     __tablename__ = "review_actions"
+    __table_args__ = (
+        Index("ix_review_actions_form_created", "form_instance_id", "created_at"),
+    )
     
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     
     # Form instance reference
     form_instance_id: Mapped[int] = mapped_column(
@@ -148,13 +160,20 @@ class ReviewAction(Base):
     
     # Action details
     action_type: Mapped[ReviewActionType] = mapped_column(
-        Enum('submit_for_review', 'request_changes', 'approve', 'reject', 'return_to_draft', name='reviewactiontype', create_type=False),
+        Enum(
+            ReviewActionType,
+            name="reviewactiontype",
+            native_enum=False,
+            length=20,
+            create_constraint=True,
+            values_callable=lambda x: [e.value for e in x],
+        ),
         nullable=False
     )
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     
     # Timestamp
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
     form_instance: Mapped["FormInstance"] = relationship("FormInstance")
@@ -3,10 +3,10 @@
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 
-from sqlalchemy import String, Text, DateTime, Boolean, JSON
+from sqlalchemy import String, Text, DateTime, Boolean, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.database import Base
+from app.database import Base, JSONType
 
 
 class Template(Base):
@@ -18,8 +18,18 @@ class Template(Base):
     """
     
     __tablename__ = "templates"
+    __table_args__ = (
+        # Containment lookups into the schema (e.g. which templates define a
+        # field id); PostgreSQL only
+        Index(
+            "ix_templates_schema_gin",
+            "schema",
+            postgresql_using="gin",
+            postgresql_ops={"schema": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
     
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     version: Mapped[str] = mapped_column(String(50), default="1.0")
@@ -28,18 +38,22 @@ class Template(Base):
     original_file_path: Mapped[str] = mapped_column(String(512), nullable=False)
     original_file_name: Mapped[str] = mapped_column(String(255), nullable=False)
     
-    # Extracted template schema (sections, fields, anchors, rules)
-    schema: Mapped[Dict[str, Any]] = mapped_column(JSON, nullable=False, default=dict)
+    # Extracted template schema (sections, fields, anchors, rules). Deferred:
+    # it can run to tens of KB and most template loads (lists, the template
+    # joined onto every form) never read it; queries that do use undefer()
+    schema: Mapped[Dict[str, Any]] = mapped_column(
+        JSONType, nullable=False, default=dict, deferred=True
+    )
     
     # Template metadata
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     is_published: Mapped[bool] = mapped_column(Boolean, default=False)
     
     # Timestamps
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[Optional[datetime]] = mapped_column(
-        DateTime, 
-        onupdate=datetime.utcnow,
+        DateTime(timezone=True), 
+        onupdate=func.now(),
         nullable=True
     )
     
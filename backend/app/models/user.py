@@ -4,7 +4,7 @@ from datetime import datetime
 from typing import Optional, List
 from enum import Enum as PyEnum
 
-from sqlalchemy import String, Boolean, DateTime, Enum
+from sqlalchemy import String, Boolean, DateTime, Enum, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -25,8 +25,12 @@ class User(Base):
     
     __tablename__ = "users"
     
-    id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    email: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # active_history: an email change must know the old address, even when
+    # it was expired, to drop the login cache entry stored under it
+    email: Mapped[str] = mapped_column(
+        String(255), unique=True, index=True, nullable=False, active_history=True
+    )
     hashed_password: Mapped[str] = mapped_column(String(255), nullable=False)
     full_name: Mapped[str] = mapped_column(String(255), nullable=False)
     role: Mapped[UserRole] = mapped_column(
@@ -36,12 +40,12 @@ class User(Base):
     )
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime, 
-        default=datetime.utcnow
+        DateTime(timezone=True), 
+        server_default=func.now()
     )
     updated_at: Mapped[Optional[datetime]] = mapped_column(
-        DateTime, 
-        onupdate=datetime.utcnow,
+        DateTime(timezone=True), 
+        onupdate=func.now(),
         nullable=True
     )
     
@@ -3,48 +3,41 @@
 from typing import Optional
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.models.user import User, UserRole
 from app.schemas.audit import ChangeEventResponse, AuditLogResponse
-from app.services.form import FormService
+from app.services.form import require_form_access
 from app.services.audit import AuditService
-from app.services.auth import get_current_active_user
 
 router = APIRouter()
 
 
-@router.get("/form/{form_id}", response_model=AuditLogResponse)
-async def get_form_audit_log(
+@router.get(
+    "/form/{form_id}",
+    response_model=AuditLogResponse,
+    dependencies=[Depends(require_form_access("Not authorized to view audit log"))],
+)
+def get_form_audit_log(
     form_id: int,
     page: int = Query(1, ge=1),
     page_size: int = Query(50, ge=1, le=100),
+    cursor: Optional[int] = None,
     field_id: Optional[str] = None,
     user_id: Optional[int] = None,
     from_date: Optional[datetime] = None,
     to_date: Optional[datetime] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: Session = Depends(get_db)
 ):
-    """Get audit log for a form with optional filters."""
-    # Check form access
-    form = FormService.get_form_instance(db, form_id, include_data=False)
-    if not form:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Form not found"
-        )
-    
-    if form.owner_id != current_user.id and current_user.role not in [UserRole.ADMIN, UserRole.REVIEWER]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view audit log"
-        )
+    """
+    Get audit log for a form with optional filters.
     
+    Follow next_cursor to page through the log; page is kept for offset
+    paging but gets slower the deeper it goes.
+    """
     result = AuditService.get_form_audit_log(
-        db, form_id, page, page_size, field_id, user_id, from_date, to_date
+        db, form_id, page, page_size, field_id, user_id, from_date, to_date, cursor
     )
     
     # Convert to response format
@@ -67,35 +60,42 @@ async def get_form_audit_log(
     
     return AuditLogResponse(
         items=items,
-        total=result["total"],
         page=result["page"],
         page_size=result["page_size"],
-        total_pages=result["total_pages"],
+        has_more=result["has_more"],
+        next_cursor=result["next_cursor"],
+    )
+
+
+@router.get(
+    "/form/{form_id}/count",
+    dependencies=[Depends(require_form_access("Not authorized to view audit log"))],
+)
+def count_form_audit_log(
+    form_id: int,
+    field_id: Optional[str] = None,
+    user_id: Optional[int] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """Count audit events for a form, with the same filters as the log."""
+    total = AuditService.count_form_audit_log(
+        db, form_id, field_id, user_id, from_date, to_date
     )
+    return {"total": total}
 
 
-@router.get("/form/{form_id}/field/{field_id}")
-async def get_field_history(
+@router.get(
+    "/form/{form_id}/field/{field_id}",
+    dependencies=[Depends(require_form_access("Not authorized to view audit log"))],
+)
+def get_field_history(
     form_id: int,
     field_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: Session = Depends(get_db)
 ):
     """Get complete history for a specific field."""
-    # Check form access
-    form = FormService.get_form_instance(db, form_id, include_data=False)
-    if not form:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Form not found"
-        )
-    
-    if form.owner_id != current_user.id and current_user.role not in [UserRole.ADMIN, UserRole.REVIEWER]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view audit log"
-        )
-    
     events = AuditService.get_field_history(db, form_id, field_id)
     
     return [
@@ -117,52 +117,28 @@ async def get_field_history(
     ]
 
 
-@router.get("/form/{form_id}/summary")
-async def get_activity_summary(
+@router.get(
+    "/form/{form_id}/summary",
+    dependencies=[Depends(require_form_access("Not authorized to view audit log"))],
+)
+def get_activity_summary(
     form_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: Session = Depends(get_db)
 ):
     """Get activity summary for a form."""
-    # Check form access
-    form = FormService.get_form_instance(db, form_id, include_data=False)
-    if not form:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Form not found"
-        )
-    
-    if form.owner_id != current_user.id and current_user.role not in [UserRole.ADMIN, UserRole.REVIEWER]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view audit log"
-        )
-    
     return AuditService.get_activity_summary(db, form_id)
 
 
-@router.get("/form/{form_id}/diff")
-async def get_version_diff(
+@router.get(
+    "/form/{form_id}/diff",
+    dependencies=[Depends(require_form_access("Not authorized to view version diff"))],
+)
+def get_version_diff(
     form_id: int,
     from_version_id: int,
     to_version_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: Session = Depends(get_db)
 ):
     """Get diff between two versions."""
-    # Check form access
-    form = FormService.get_form_instance(db, form_id, include_data=False)
-    if not form:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Form not found"
-        )
-    
-    if form.owner_id != current_user.id and current_user.role not in [UserRole.ADMIN, UserRole.REVIEWER]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view version diff"
-        )
-    
     changes = AuditService.get_changes_between_versions(db, form_id, from_version_id, to_version_id)
     return {"changes": changes}
@@ -1,7 +1,7 @@
 """Authentication router."""
 
 from datetime import timedelta
-from typing import List
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
@@ -23,7 +23,7 @@ router = APIRouter()
 
 
 @router.post("/register", response_model=UserResponse)
-async def register(
+def register(
     user_data: UserCreate,
     db: Session = Depends(get_db)
 ):
@@ -33,7 +33,7 @@ async def register(
 
 
 @router.post("/login", response_model=Token)
-async def login(
+def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
@@ -59,7 +59,7 @@ async def login(
 
 
 @router.post("/login/json", response_model=Token)
-async def login_json(
+def login_json(
     credentials: UserLogin,
     db: Session = Depends(get_db)
 ):
@@ -93,12 +93,23 @@ async def get_current_user_info(
 
 
 @router.get("/users", response_model=List[UserResponse])
-async def list_users(
+def list_users(
+    after_id: Optional[int] = None,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(UserRole.ADMIN))
 ):
-    """List all users (admin only)."""
-    users = db.query(User).offset(skip).limit(limit).all()
-    return users
+    """
+    List all users (admin only), ordered by id.
+    
+    Page with after_id: pass the last id of the previous page. This walks the
+    primary key index instead of discarding skip rows; skip is kept for
+    existing clients.
+    """
+    query = db.query(User).order_by(User.id)
+    if after_id is not None:
+        query = query.filter(User.id > after_id)
+    else:
+        query = query.offset(skip)
+    return query.limit(limit).all()
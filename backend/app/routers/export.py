@@ -3,171 +3,334 @@
 import os
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse, RedirectResponse, ORJSONResponse
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
 
 from app.database import get_db
-from app.models.user import User, UserRole
-from app.services.form import FormService
+from app.models.user import User
+from app.models.document import DocumentJob, DocumentJobStatus
+from app.schemas.document import DocumentJobResponse
+from app.services.form import FormService, require_form_access
 from app.services.document import DocumentService
+from app.services.http_cache import ETagService, REVALIDATE
+from app.services.storage import StorageService, DOCX_MEDIA_TYPE, PDF_MEDIA_TYPE
 from app.services.auth import get_current_active_user
 
 router = APIRouter()
 
 
-@router.post("/form/{form_id}/generate")
-async def generate_documents(
-    form_id: int,
-    version_id: Optional[int] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+def _serve_document(
+    request: Request,
+    path: str,
+    media_type: str,
+    filename: str,
+    versioned: bool,
+    stat_result: Optional[os.stat_result] = None
 ):
-    """Generate DOCX and PDF documents for a form."""
-    # Check form access
-    form = FormService.get_form_instance(db, form_id, include_data=False)
-    if not form:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Form not found"
-        )
+    """
+    Serve a generated document, redirecting to object storage when configured.
     
-    if form.owner_id != current_user.id and current_user.role not in [UserRole.ADMIN, UserRole.REVIEWER]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to generate documents"
-        )
+    The file is stat'ed once, unless the caller already did: the result drives
+    the 404, the ETag and the FileResponse headers. A matching If-None-Match
+    gets a 304 without opening the file. Version documents never change, so
+    clients may reuse them for a few minutes; current-data documents are
+    regenerated and must revalidate.
+    """
+    if stat_result is None:
+        try:
+            stat_result = os.stat(path)
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Document not found"
+            )
     
-    docx_path, pdf_path = DocumentService.generate_documents(db, form_id, version_id)
+    etag = f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+    cache_control = "private, max-age=300" if versioned else REVALIDATE
+    if ETagService.matches(request, etag):
+        return ETagService.not_modified(etag, cache_control)
+    headers = ETagService.headers(etag, cache_control)
     
-    return {
-        "message": "Documents generated successfully",
-        "docx_path": docx_path,
-        "pdf_path": pdf_path,
-    }
+    if StorageService.is_remote():
+        url = StorageService.presigned_url(StorageService.object_key(path), filename)
+        return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+    return FileResponse(
+        path,
+        media_type=media_type,
+        filename=filename,
+        stat_result=stat_result,
+        headers=headers,
+    )
 
 
-@router.get("/form/{form_id}/docx")
-async def download_docx(
-    form_id: int,
-    version_id: Optional[int] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-):
-    """Download the generated DOCX for a form."""
-    # Check form access
-    form = FormService.get_form_instance(db, form_id, include_data=False)
-    if not form:
+def _version_document_stat(
+    background_tasks: BackgroundTasks,
+    version_id: int,
+    version: Row,
+    path: Optional[str]
+) -> Optional[os.stat_result]:
+    """
+    Stat a stored version document, or return None if it is not ready.
+    
+    Missing documents are generated by a background task rather than inline,
+    so a download never holds a worker for a LibreOffice conversion. Once
+    that generation has failed, the error is reported instead of a retry.
+    """
+    if path:
+        try:
+            return os.stat(path)
+        except FileNotFoundError:
+            pass
+    
+    error = DocumentService.get_generation_error(version.form_instance_id, version_id)
+    if error:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Form not found"
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=error
         )
     
-    if form.owner_id != current_user.id and current_user.role not in [UserRole.ADMIN, UserRole.REVIEWER]:
+    DocumentService.schedule_version_documents(
+        background_tasks, version.form_instance_id, version_id
+    )
+    return None
+
+
+def _get_form_version(db: Session, form_id: int, version_id: int) -> Row:
+    """Version row with its document paths, 404 unless it belongs to the form."""
+    version = FormService.get_version_with_form_meta(db, version_id)
+    if not version or version.form_instance_id != form_id:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to download documents"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Version not found"
         )
-    
-    # Check if documents exist, generate if not
-    if version_id:
-        paths = DocumentService.get_document_paths(db, form_id, version_id)
-        if paths:
-            docx_path = paths[0]
-        else:
-            docx_path, _ = DocumentService.generate_documents(db, form_id, version_id)
-    else:
-        docx_path, _ = DocumentService.generate_documents(db, form_id)
-    
-    if not os.path.exists(docx_path):
+    return version
+
+
+def _pending_response(request: Request) -> ORJSONResponse:
+    """202 telling the client to retry the same URL once generation finishes."""
+    return ORJSONResponse(
+        {"status": "pending"},
+        status_code=status.HTTP_202_ACCEPTED,
+        headers={"Location": str(request.url), "Retry-After": "5"},
+    )
+
+
+def _get_job(db: Session, job_id: int, user: User) -> DocumentJob:
+    """Job by ID, 404 if missing and 403 unless the user may read its form."""
+    job = DocumentService.get_job(db, job_id)
+    if not job:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Document not found"
+            detail="Job not found"
         )
-    
-    filename = f"form_{form_id}_v{version_id or 'current'}.docx"
-    return FileResponse(
-        docx_path,
-        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        filename=filename
+    FormService.check_form_access(
+        db, job.form_instance_id, user, "Not authorized to view this job"
     )
+    return job
 
 
-@router.get("/form/{form_id}/pdf")
-async def download_pdf(
+def _serve_job_document(
+    request: Request,
+    job: DocumentJob,
+    path: Optional[str],
+    media_type: str,
+    extension: str
+):
+    """Serve a job's output once it is done; 202 while it is still running."""
+    if job.status in (DocumentJobStatus.PENDING, DocumentJobStatus.RUNNING):
+        return _pending_response(request)
+    if job.status == DocumentJobStatus.FAILED:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=job.error
+        )
+    
+    # A job's files are never regenerated, so they cache like version documents
+    filename = f"form_{job.form_instance_id}_v{job.version_id or 'current'}.{extension}"
+    return _serve_document(request, path, media_type, filename, versioned=True)
+
+
+@router.post(
+    "/form/{form_id}/generate",
+    response_model=DocumentJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(require_form_access("Not authorized to generate documents"))],
+)
+def generate_documents(
+    request: Request,
+    response: Response,
+    background_tasks: BackgroundTasks,
     form_id: int,
     version_id: Optional[int] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Download the generated PDF for a form."""
-    # Check form access
-    form = FormService.get_form_instance(db, form_id, include_data=False)
-    if not form:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Form not found"
-        )
+    """
+    Queue DOCX and PDF generation for a form.
     
-    if form.owner_id != current_user.id and current_user.role not in [UserRole.ADMIN, UserRole.REVIEWER]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to download documents"
-        )
+    Rendering and PDF conversion run after the response; poll the returned
+    job (also in the Location header) and download its files once done.
+    """
+    job = DocumentService.create_job(db, form_id, version_id, current_user)
+    DocumentService.schedule_job(background_tasks, job.id)
     
-    # Check if documents exist, generate if not
+    response.headers["Location"] = str(request.url_for("get_document_job", job_id=job.id))
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=DocumentJobResponse)
+def get_document_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Get the status of a document generation job."""
+    return _get_job(db, job_id, current_user)
+
+
+@router.get("/jobs/{job_id}/docx")
+def download_job_docx(
+    request: Request,
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Download the DOCX a job generated."""
+    job = _get_job(db, job_id, current_user)
+    return _serve_job_document(request, job, job.docx_path, DOCX_MEDIA_TYPE, "docx")
+
+
+@router.get("/jobs/{job_id}/pdf")
+def download_job_pdf(
+    request: Request,
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Download the PDF a job generated."""
+    job = _get_job(db, job_id, current_user)
+    return _serve_job_document(request, job, job.pdf_path, PDF_MEDIA_TYPE, "pdf")
+
+
+@router.get(
+    "/form/{form_id}/docx",
+    dependencies=[Depends(require_form_access("Not authorized to download documents"))],
+)
+def download_docx(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    form_id: int,
+    version_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Download the generated DOCX for a form."""
     if version_id:
-        paths = DocumentService.get_document_paths(db, form_id, version_id)
-        if paths:
-            pdf_path = paths[1]
-        else:
-            _, pdf_path = DocumentService.generate_documents(db, form_id, version_id)
-    else:
-        _, pdf_path = DocumentService.generate_documents(db, form_id)
+        version = _get_form_version(db, form_id, version_id)
+        stat_result = _version_document_stat(
+            background_tasks, version_id, version, version.generated_docx_path
+        )
+        if not stat_result:
+            return _pending_response(request)
+        filename = f"form_{form_id}_v{version_id}.docx"
+        return _serve_document(
+            request, version.generated_docx_path, DOCX_MEDIA_TYPE, filename,
+            versioned=True, stat_result=stat_result
+        )
     
-    if not os.path.exists(pdf_path):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Document not found"
+    # Current data changes on every autosave, so render it on demand
+    docx_path, _ = DocumentService.generate_documents(db, form_id)
+    filename = f"form_{form_id}_vcurrent.docx"
+    return _serve_document(request, docx_path, DOCX_MEDIA_TYPE, filename, versioned=False)
+
+
+@router.get(
+    "/form/{form_id}/pdf",
+    dependencies=[Depends(require_form_access("Not authorized to download documents"))],
+)
+def download_pdf(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    form_id: int,
+    version_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Download the generated PDF for a form."""
+    if version_id:
+        version = _get_form_version(db, form_id, version_id)
+        stat_result = _version_document_stat(
+            background_tasks, version_id, version, version.generated_pdf_path
+        )
+        if not stat_result:
+            return _pending_response(request)
+        filename = f"form_{form_id}_v{version_id}.pdf"
+        return _serve_document(
+            request, version.generated_pdf_path, PDF_MEDIA_TYPE, filename,
+            versioned=True, stat_result=stat_result
         )
     
-    filename = f"form_{form_id}_v{version_id or 'current'}.pdf"
-    return FileResponse(
-        pdf_path,
-        media_type="application/pdf",
-        filename=filename
-    )
+    # Current data changes on every autosave, so render it on demand
+    _, pdf_path = DocumentService.generate_documents(db, form_id)
+    filename = f"form_{form_id}_vcurrent.pdf"
+    return _serve_document(request, pdf_path, PDF_MEDIA_TYPE, filename, versioned=False)
 
 
 @router.get("/version/{version_id}/docx")
-async def download_version_docx(
+def download_version_docx(
+    request: Request,
+    background_tasks: BackgroundTasks,
     version_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Download DOCX for a specific version."""
-    version = FormService.get_version(db, version_id)
+    version = FormService.get_version_with_form_meta(db, version_id)
     if not version:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Version not found"
         )
     
-    return await download_docx(version.form_instance_id, version_id, db, current_user)
+    FormService.authorize_form_read(version.owner_id, current_user, "Not authorized to download documents")
+    
+    stat_result = _version_document_stat(
+        background_tasks, version_id, version, version.generated_docx_path
+    )
+    if not stat_result:
+        return _pending_response(request)
+    filename = f"form_{version.form_instance_id}_v{version_id}.docx"
+    return _serve_document(
+        request, version.generated_docx_path, DOCX_MEDIA_TYPE, filename,
+        versioned=True, stat_result=stat_result
+    )
 
 
 @router.get("/version/{version_id}/pdf")
-async def download_version_pdf(
+def download_version_pdf(
+    request: Request,
+    background_tasks: BackgroundTasks,
     version_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """Download PDF for a specific version."""
-    version = FormService.get_version(db, version_id)
+    version = FormService.get_version_with_form_meta(db, version_id)
     if not version:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Version not found"
         )
     
-    return await download_pdf(version.form_instance_id, version_id, db, current_user)
+    FormService.authorize_form_read(version.owner_id, current_user, "Not authorized to download documents")
+    
+    stat_result = _version_document_stat(
+        background_tasks, version_id, version, version.generated_pdf_path
+    )
+    if not stat_result:
+        return _pending_response(request)
+    filename = f"form_{version.form_instance_id}_v{version_id}.pdf"
+    return _serve_document(
+        request, version.generated_pdf_path, PDF_MEDIA_TYPE, filename,
+        versioned=True, stat_result=stat_result
+    )
@@ -15,14 +15,14 @@ from app.schemas.form import (
     FormDataUpdate,
     FormListResponse,
 )
-from app.services.form import FormService
+from app.services.form import FormService, require_form_access
 from app.services.auth import get_current_active_user, require_role
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[FormListResponse])
-async def list_forms(
+def list_forms(
     skip: int = 0,
     limit: int = 100,
     status_filter: Optional[FormStatus] = None,
@@ -46,11 +46,11 @@ async def list_forms(
         result.append(FormListResponse(
             id=form.id,
             template_id=form.template_id,
-            template_name=form.template.name if form.template else "Unknown",
+            template_name=form.template_name_cache or "Unknown",
             title=form.title,
             status=form.status,
             current_version_number=form.current_version_number,
-            owner_name=form.owner.full_name if form.owner else "Unknown",
+            owner_name=form.owner_name_cache or "Unknown",
             created_at=form.created_at,
             updated_at=form.updated_at,
         ))
@@ -59,7 +59,7 @@ async def list_forms(
 
 
 @router.post("", response_model=FormInstanceResponse)
-async def create_form(
+def create_form(
     form_data: FormInstanceCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -77,18 +77,24 @@ async def create_form(
         updated_at=form.updated_at,
         submitted_at=form.submitted_at,
         data={},
-        template_name=form.template.name if form.template else None,
-        owner_name=form.owner.full_name if form.owner else None,
+        # Set from the template and user when the form was created
+        template_name=form.template_name_cache,
+        owner_name=form.owner_name_cache,
     )
 
 
-@router.get("/{form_id}", response_model=FormInstanceResponse)
-async def get_form(
+@router.get(
+    "/{form_id}",
+    response_model=FormInstanceResponse,
+    dependencies=[Depends(require_form_access())],
+)
+def get_form(
     form_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: Session = Depends(get_db)
 ):
     """Get a form instance by ID."""
+    # Access was decided from the cached owner_id; only now load
+    # the form with its data blob
     form = FormService.get_form_instance(db, form_id)
     if not form:
         raise HTTPException(
@@ -96,13 +102,6 @@ async def get_form(
             detail="Form not found"
         )
     
-    # Check access permissions
-    if form.owner_id != current_user.id and current_user.role not in [UserRole.ADMIN, UserRole.REVIEWER]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view this form"
-        )
-    
     return FormInstanceResponse(
         id=form.id,
         template_id=form.template_id,
@@ -120,7 +119,7 @@ async def get_form(
 
 
 @router.put("/{form_id}", response_model=FormInstanceResponse)
-async def update_form_metadata(
+def update_form_metadata(
     form_id: int,
     update_data: FormInstanceUpdate,
     db: Session = Depends(get_db),
@@ -137,7 +136,7 @@ async def update_form_metadata(
 
 
 @router.post("/{form_id}/data")
-async def update_form_data(
+def update_form_data(
     form_id: int,
     data_update: FormDataUpdate,
     request: Request,
@@ -156,33 +155,21 @@ async def update_form_data(
     return {"message": "Form data updated", "data": form_data.data}
 
 
-@router.get("/{form_id}/data")
-async def get_form_data(
+@router.get(
+    "/{form_id}/data",
+    dependencies=[Depends(require_form_access())],
+)
+def get_form_data(
     form_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: Session = Depends(get_db)
 ):
     """Get current form data."""
-    form = FormService.get_form_instance(db, form_id, include_data=False)
-    if not form:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Form not found"
-        )
-    
-    # Check access
-    if form.owner_id != current_user.id and current_user.role not in [UserRole.ADMIN, UserRole.REVIEWER]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view this form"
-        )
-    
     data = FormService.get_form_data(db, form_id)
     return {"data": data}
 
 
 @router.delete("/{form_id}")
-async def delete_form(
+def delete_form(
     form_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -2,7 +2,7 @@
 
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, UploadFile, File, Form
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -14,13 +14,16 @@ from app.schemas.template import (
     TemplateListResponse,
 )
 from app.services.template import TemplateService
+from app.services.http_cache import ETagService
 from app.services.auth import get_current_active_user, require_role
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[TemplateListResponse])
-async def list_templates(
+def list_templates(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     active_only: bool = True,
@@ -28,22 +31,40 @@ async def list_templates(
     current_user: User = Depends(get_current_active_user)
 ):
     """List all templates."""
+    # One aggregate decides whether the client's copy is still current
+    etag = ETagService.make_etag(
+        TemplateService.get_templates_fingerprint(db, active_only), skip, limit
+    )
+    if ETagService.matches(request, etag):
+        return ETagService.not_modified(etag)
+    
+    response.headers.update(ETagService.headers(etag))
     templates = TemplateService.get_templates(db, skip, limit, active_only)
     return templates
 
 
 @router.get("/published", response_model=List[TemplateListResponse])
-async def list_published_templates(
+def list_published_templates(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
     """List all published templates available for form creation."""
     templates = TemplateService.get_published_templates(db)
+    
+    # The list is usually served from the in-process cache, so hash it
+    # rather than ask the database
+    etag = ETagService.make_etag(templates)
+    if ETagService.matches(request, etag):
+        return ETagService.not_modified(etag)
+    
+    response.headers.update(ETagService.headers(etag))
     return templates
 
 
 @router.get("/{template_id}", response_model=TemplateResponse)
-async def get_template(
+def get_template(
     template_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -60,6 +81,7 @@ async def get_template(
 
 @router.post("", response_model=TemplateResponse)
 async def create_template(
+    request: Request,
     name: str = Form(...),
     description: str = Form(None),
     version: str = Form("1.0"),
@@ -73,12 +95,14 @@ async def create_template(
         description=description,
         version=version
     )
-    template = await TemplateService.create_template(db, template_data, file)
+    template = await TemplateService.create_template(
+        db, template_data, file, executor=request.app.state.cpu_pool
+    )
     return template
 
 
 @router.put("/{template_id}", response_model=TemplateResponse)
-async def update_template(
+def update_template(
     template_id: int,
     template_data: TemplateUpdate,
     db: Session = Depends(get_db),
@@ -95,7 +119,7 @@ async def update_template(
 
 
 @router.delete("/{template_id}")
-async def delete_template(
+def delete_template(
     template_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(UserRole.ADMIN))
@@ -111,40 +135,32 @@ async def delete_template(
 
 
 @router.post("/{template_id}/publish")
-async def publish_template(
+def publish_template(
     template_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(UserRole.ADMIN))
 ):
     """Publish a template for use (admin only)."""
-    template = TemplateService.get_template(db, template_id)
-    if not template:
+    if not TemplateService.set_published(db, template_id, True):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Template not found"
         )
     
-    template.is_published = True
-    db.commit()
-    
     return {"message": "Template published successfully"}
 
 
 @router.post("/{template_id}/unpublish")
-async def unpublish_template(
+def unpublish_template(
     template_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(require_role(UserRole.ADMIN))
 ):
     """Unpublish a template (admin only)."""
-    template = TemplateService.get_template(db, template_id)
-    if not template:
+    if not TemplateService.set_published(db, template_id, False):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Template not found"
         )
     
-    template.is_published = False
-    db.commit()
-    
     return {"message": "Template unpublished successfully"}
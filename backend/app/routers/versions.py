@@ -2,62 +2,50 @@
 
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
+from pydantic import TypeAdapter
 from sqlalchemy.orm import Session
 
+from app.config import get_settings
 from app.database import get_db
-from app.models.user import User, UserRole
-from app.schemas.form import FormVersionResponse, FormVersionCreate
-from app.services.form import FormService
+from app.models.user import User
+from app.schemas.form import FormVersionResponse, FormVersionListResponse, FormVersionCreate
+from app.services.form import FormService, require_form_access
+from app.services.document import DocumentService
+from app.services.http_cache import ETagService
 from app.services.auth import get_current_active_user
 
+settings = get_settings()
 router = APIRouter()
 
+# Built once: validates a whole version listing straight from the ORM objects
+_versions_adapter = TypeAdapter(List[FormVersionListResponse])
 
-@router.get("/form/{form_id}", response_model=List[FormVersionResponse])
-async def list_form_versions(
+
+@router.get(
+    "/form/{form_id}",
+    response_model=List[FormVersionListResponse],
+    dependencies=[Depends(require_form_access())],
+)
+def list_form_versions(
+    request: Request,
+    response: Response,
     form_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: Session = Depends(get_db)
 ):
-    """Get all versions for a form."""
-    form = FormService.get_form_instance(db, form_id, include_data=False)
-    if not form:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Form not found"
-        )
-    
-    # Check access
-    if form.owner_id != current_user.id and current_user.role not in [UserRole.ADMIN, UserRole.REVIEWER]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view this form"
-        )
+    """Get all versions for a form, without their snapshots."""
+    # One aggregate decides whether the client's copy is still current
+    etag = ETagService.make_etag(FormService.get_versions_fingerprint(db, form_id))
+    if ETagService.matches(request, etag):
+        return ETagService.not_modified(etag)
     
+    response.headers.update(ETagService.headers(etag))
     versions = FormService.get_versions(db, form_id)
-    
-    result = []
-    for v in versions:
-        result.append(FormVersionResponse(
-            id=v.id,
-            form_instance_id=v.form_instance_id,
-            version_number=v.version_number,
-            version_label=v.version_label,
-            data_snapshot=v.data_snapshot,
-            status_at_creation=v.status_at_creation,
-            generated_docx_path=v.generated_docx_path,
-            generated_pdf_path=v.generated_pdf_path,
-            created_at=v.created_at,
-            created_by_id=v.created_by_id,
-            created_by_name=v.created_by.full_name if v.created_by else None,
-        ))
-    
-    return result
+    return _versions_adapter.validate_python(versions, from_attributes=True)
 
 
 @router.get("/{version_id}", response_model=FormVersionResponse)
-async def get_version(
+def get_version(
     version_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -71,31 +59,17 @@ async def get_version(
         )
     
     # Check access via form
-    form = FormService.get_form_instance(db, version.form_instance_id, include_data=False)
-    if form.owner_id != current_user.id and current_user.role not in [UserRole.ADMIN, UserRole.REVIEWER]:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view this version"
-        )
-    
-    return FormVersionResponse(
-        id=version.id,
-        form_instance_id=version.form_instance_id,
-        version_number=version.version_number,
-        version_label=version.version_label,
-        data_snapshot=version.data_snapshot,
-        status_at_creation=version.status_at_creation,
-        generated_docx_path=version.generated_docx_path,
-        generated_pdf_path=version.generated_pdf_path,
-        created_at=version.created_at,
-        created_by_id=version.created_by_id,
-        created_by_name=version.created_by.full_name if version.created_by else None,
+    FormService.check_form_access(
+        db, version.form_instance_id, current_user, "Not authorized to view this version"
     )
+    
+    return FormVersionResponse.model_validate(version)
 
 
 @router.post("/form/{form_id}", response_model=FormVersionResponse)
-async def create_version(
+def create_version(
     form_id: int,
+    background_tasks: BackgroundTasks,
     version_data: Optional[FormVersionCreate] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
@@ -104,16 +78,9 @@ async def create_version(
     version_label = version_data.version_label if version_data else None
     version = FormService.create_version(db, form_id, current_user, version_label)
     
-    return FormVersionResponse(
-        id=version.id,
-        form_instance_id=version.form_instance_id,
-        version_number=version.version_number,
-        version_label=version.version_label,
-        data_snapshot=version.data_snapshot,
-        status_at_creation=version.status_at_creation,
-        generated_docx_path=version.generated_docx_path,
-        generated_pdf_path=version.generated_pdf_path,
-        created_at=version.created_at,
-        created_by_id=version.created_by_id,
-        created_by_name=version.created_by.full_name if version.created_by else None,
-    )
+    # Optionally render the snapshot's DOCX/PDF after responding, so its
+    # first download doesn't have to wait for them
+    if settings.prerender_version_documents:
+        DocumentService.schedule_version_documents(background_tasks, form_id, version.id)
+    
+    return FormVersionResponse.model_validate(version)
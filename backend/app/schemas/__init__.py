@@ -22,6 +22,7 @@ from app.schemas.form import (
     FormInstanceUpdate,
     FormInstanceResponse,
     FormVersionResponse,
+    FormVersionListResponse,
     FormDataUpdate,
     FieldChange,
 )
@@ -36,6 +37,7 @@ from app.schemas.review import (
     ReviewActionCreate,
     ReviewActionResponse,
 )
+from app.schemas.document import DocumentJobResponse
 
 __all__ = [
     # User
@@ -58,6 +60,7 @@ __all__ = [
     "FormInstanceUpdate",
     "FormInstanceResponse",
     "FormVersionResponse",
+    "FormVersionListResponse",
     "FormDataUpdate",
     "FieldChange",
     # Audit
@@ -69,4 +72,6 @@ __all__ = [
     "CommentThreadResponse",
     "ReviewActionCreate",
     "ReviewActionResponse",
+    # Documents
+    "DocumentJobResponse",
 ]
@@ -28,7 +28,11 @@ class ChangeEventResponse(BaseModel):
 class AuditLogResponse(BaseModel):
     """Schema for paginated audit log responses."""
     items: List[ChangeEventResponse]
-    total: int
+    # No longer counted per page; use /audit/form/{id}/count
+    total: Optional[int] = None
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    has_more: bool
+    # Pass back as ?cursor= to fetch the next page
+    next_cursor: Optional[int] = None
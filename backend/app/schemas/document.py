@@ -0,0 +1,22 @@
+"""Document generation Pydantic schemas."""
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.models.document import DocumentJobStatus
+
+
+class DocumentJobResponse(BaseModel):
+    """Schema for document generation job responses."""
+    id: int
+    form_instance_id: int
+    version_id: Optional[int]
+    status: DocumentJobStatus
+    error: Optional[str]
+    created_at: datetime
+    finished_at: Optional[datetime]
+    
+    class Config:
+        from_attributes = True
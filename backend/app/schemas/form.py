@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, AliasPath, BaseModel, Field
 
 from app.models.form import FormStatus
 
@@ -70,7 +70,27 @@ class FormVersionResponse(BaseModel):
     generated_pdf_path: Optional[str]
     created_at: datetime
     created_by_id: int
-    created_by_name: Optional[str] = None
+    # Read from the loaded creator when validated from a FormVersion
+    created_by_name: Optional[str] = Field(
+        None, validation_alias=AliasChoices("created_by_name", AliasPath("created_by", "full_name"))
+    )
+    
+    class Config:
+        from_attributes = True
+
+
+class FormVersionListResponse(BaseModel):
+    """Schema for form version list responses (no snapshot or document paths)."""
+    id: int
+    form_instance_id: int
+    version_number: int
+    version_label: Optional[str]
+    status_at_creation: FormStatus
+    created_at: datetime
+    created_by_id: int
+    created_by_name: Optional[str] = Field(
+        None, validation_alias=AliasChoices("created_by_name", AliasPath("created_by", "full_name"))
+    )
     
     class Config:
         from_attributes = True
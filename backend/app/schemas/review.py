@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Optional, List
 
-from pydantic import BaseModel, Field
+from pydantic import AliasChoices, AliasPath, BaseModel, Field
 
 from app.models.review import ReviewActionType
 
@@ -21,7 +21,10 @@ class CommentResponse(BaseModel):
     id: int
     thread_id: int
     author_id: int
-    author_name: Optional[str] = None
+    # Read from the loaded author when validated from a Comment
+    author_name: Optional[str] = Field(
+        None, validation_alias=AliasChoices("author_name", AliasPath("author", "full_name"))
+    )
     content: str
     created_at: datetime
     updated_at: Optional[datetime]
@@ -40,7 +43,10 @@ class CommentThreadResponse(BaseModel):
     is_resolved: bool
     resolved_at: Optional[datetime]
     resolved_by_id: Optional[int]
-    resolved_by_name: Optional[str] = None
+    # Read from the loaded resolver when validated from a CommentThread
+    resolved_by_name: Optional[str] = Field(
+        None, validation_alias=AliasChoices("resolved_by_name", AliasPath("resolved_by", "full_name"))
+    )
     created_at: datetime
     comments: List[CommentResponse] = []
     
@@ -65,7 +71,10 @@ class ReviewActionResponse(BaseModel):
     form_instance_id: int
     version_id: int
     performed_by_id: int
-    performed_by_name: Optional[str] = None
+    # Read from the loaded performer when validated from a ReviewAction
+    performed_by_name: Optional[str] = Field(
+        None, validation_alias=AliasChoices("performed_by_name", AliasPath("performed_by", "full_name"))
+    )
     action_type: ReviewActionType
     notes: Optional[str]
     created_at: datetime
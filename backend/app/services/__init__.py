@@ -6,6 +6,9 @@ from app.services.form import FormService
 from app.services.audit import AuditService
 from app.services.review import ReviewService
 from app.services.document import DocumentService
+from app.services.storage import StorageService
+from app.services.cache import CacheService
+from app.services.http_cache import ETagService
 
 __all__ = [
     "AuthService",
@@ -14,4 +17,7 @@ __all__ = [
     "AuditService",
     "ReviewService",
     "DocumentService",
+    "StorageService",
+    "CacheService",
+    "ETagService",
 ]
@@ -3,28 +3,67 @@
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy.orm import Query, Session, aliased, joinedload, load_only, raiseload, selectinload
+from sqlalchemy import String, func, or_, select, text, tuple_
 
-from app.models.audit import ChangeEvent
+from app.config import get_settings
+from app.database import JSONType
+from app.models.audit import ChangeEvent, FormActivityStats, FormUserStats, FormFieldStats
 from app.models.form import FormVersion
+from app.models.user import User
+from app.services.cache import CacheService
+
+settings = get_settings()
+
+AUDIT_COUNT_KEY = "form:{form_id}:audit_count:{filters}"
+
+# Key-by-key diff of two version snapshots, computed next to the data on
+# PostgreSQL so only changed keys are returned. A JSON null counts as
+# missing, as in the Python diff; no rows unless both versions belong to
+# the form.
+VERSION_DIFF_SQL = text("""
+    WITH v AS (
+        SELECT id, data_snapshot FROM form_versions
+        WHERE id IN (:from_version_id, :to_version_id) AND form_instance_id = :form_id
+    )
+    SELECT key AS field_id,
+           NULLIF(f.value, 'null'::jsonb) AS old_value,
+           NULLIF(t.value, 'null'::jsonb) AS new_value
+    FROM jsonb_each((SELECT data_snapshot FROM v WHERE id = :from_version_id)) f
+    FULL OUTER JOIN jsonb_each((SELECT data_snapshot FROM v WHERE id = :to_version_id)) t USING (key)
+    WHERE (SELECT count(*) FROM v) = 2
+      AND NULLIF(f.value, 'null'::jsonb) IS DISTINCT FROM NULLIF(t.value, 'null'::jsonb)
+    ORDER BY key
+""").columns(field_id=String, old_value=JSONType, new_value=JSONType)
+
+# Audit rows only display the author's name; skip the rest of the user row.
+# Any other relationship raises instead of lazy-loading once per row.
+EVENT_LOAD_OPTIONS = (
+    joinedload(ChangeEvent.user).load_only(User.id, User.full_name),
+    raiseload("*"),
+)
+
+# A page holds few distinct authors: load them with one small IN query so
+# the LIMITed event query scans change_events alone
+EVENT_PAGE_LOAD_OPTIONS = (
+    selectinload(ChangeEvent.user).load_only(User.id, User.full_name),
+    raiseload("*"),
+)
 
 
 class AuditService:
     """Service for audit trail operations."""
     
     @staticmethod
-    def get_form_audit_log(
+    def _filtered_events(
         db: Session,
         form_id: int,
-        page: int = 1,
-        page_size: int = 50,
         field_id: Optional[str] = None,
         user_id: Optional[int] = None,
         from_date: Optional[datetime] = None,
         to_date: Optional[datetime] = None
-    ) -> Dict[str, Any]:
-        """Get paginated audit log for a form."""
+    ) -> Query:
+        """A form's change events, narrowed by the audit log filters."""
         query = db.query(ChangeEvent).filter(
             ChangeEvent.form_instance_id == form_id
         )
@@ -38,25 +77,87 @@ class AuditService:
             query = query.filter(ChangeEvent.timestamp >= from_date)
         if to_date:
             query = query.filter(ChangeEvent.timestamp <= to_date)
+        return query
+    
+    @staticmethod
+    def get_form_audit_log(
+        db: Session,
+        form_id: int,
+        page: int = 1,
+        page_size: int = 50,
+        field_id: Optional[str] = None,
+        user_id: Optional[int] = None,
+        from_date: Optional[datetime] = None,
+        to_date: Optional[datetime] = None,
+        cursor: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Get paginated audit log for a form, newest first.
         
-        # Get total count
-        total = query.count()
-        
-        # Get paginated results
-        events = query.options(
-            joinedload(ChangeEvent.user)
+        With a cursor (the id of the last event already seen), the page
+        starts right after that event: a range scan on ix_change_events_form_ts
+        however deep the page is. Without one, page is used as an offset.
+        No total is counted; see count_form_audit_log.
+        """
+        query = AuditService._filtered_events(
+            db, form_id, field_id, user_id, from_date, to_date
+        ).options(
+            *EVENT_PAGE_LOAD_OPTIONS
         ).order_by(
-            ChangeEvent.timestamp.desc()
-        ).offset((page - 1) * page_size).limit(page_size).all()
+            # Events written in one transaction share a timestamp; id keeps their order
+            ChangeEvent.timestamp.desc(),
+            ChangeEvent.id.desc()
+        )
+        if cursor:
+            # Compare against the stored (timestamp, id) rather than a value
+            # sent by the client, which may not round-trip exactly (SQLite
+            # keeps timestamps as text)
+            anchor = aliased(ChangeEvent)
+            query = query.filter(
+                tuple_(ChangeEvent.timestamp, ChangeEvent.id)
+                < select(anchor.timestamp, anchor.id).where(anchor.id == cursor).scalar_subquery()
+            )
+        else:
+            query = query.offset((page - 1) * page_size)
+        
+        # One extra row tells whether another page follows
+        events = query.limit(page_size + 1).all()
+        has_more = len(events) > page_size
+        events = events[:page_size]
         
         return {
             "items": events,
-            "total": total,
             "page": page,
             "page_size": page_size,
-            "total_pages": (total + page_size - 1) // page_size,
+            "has_more": has_more,
+            "next_cursor": events[-1].id if has_more else None,
         }
     
+    @staticmethod
+    def count_form_audit_log(
+        db: Session,
+        form_id: int,
+        field_id: Optional[str] = None,
+        user_id: Optional[int] = None,
+        from_date: Optional[datetime] = None,
+        to_date: Optional[datetime] = None
+    ) -> int:
+        """
+        Number of audit events matching the filters.
+        
+        Counting scans every matching event, so the result is cached for
+        audit_count_cache_ttl seconds when Redis is configured.
+        """
+        filters = f"{field_id}|{user_id}|{from_date and from_date.isoformat()}|{to_date and to_date.isoformat()}"
+        key = AUDIT_COUNT_KEY.format(form_id=form_id, filters=filters)
+        total = CacheService.get_json(key)
+        if total is None:
+            total = AuditService._filtered_events(
+                db, form_id, field_id, user_id, from_date, to_date
+            ).with_entities(func.count(ChangeEvent.id)).scalar()
+            CacheService.set_json(key, total, settings.audit_count_cache_ttl)
+        return total
+    
     @staticmethod
     def get_version_changes(
         db: Session,
@@ -68,8 +169,8 @@ class AuditService:
             ChangeEvent.form_instance_id == form_id,
             ChangeEvent.version_id == version_id
         ).options(
-            joinedload(ChangeEvent.user)
-        ).order_by(ChangeEvent.timestamp.asc()).all()
+            *EVENT_LOAD_OPTIONS
+        ).order_by(ChangeEvent.timestamp.asc(), ChangeEvent.id.asc()).all()
     
     @staticmethod
     def get_field_history(
@@ -82,8 +183,8 @@ class AuditService:
             ChangeEvent.form_instance_id == form_id,
             ChangeEvent.field_id == field_id
         ).options(
-            joinedload(ChangeEvent.user)
-        ).order_by(ChangeEvent.timestamp.asc()).all()
+            *EVENT_LOAD_OPTIONS
+        ).order_by(ChangeEvent.timestamp.asc(), ChangeEvent.id.asc()).all()
     
     @staticmethod
     def reconstruct_form_state(
@@ -94,22 +195,49 @@ class AuditService:
         """
         Reconstruct form state at a specific point in time.
         
-        This replays all change events up to the target timestamp.
+        Starts from the latest version snapshot taken at or before the target
+        timestamp and replays only the change events since then. Snapshots
+        copy the form data, which only ever changes through change events,
+        so the result is the same as replaying the whole log.
         """
-        # Get all events up to the timestamp
-        events = db.query(ChangeEvent).filter(
+        snapshot = db.execute(
+            select(FormVersion.id, FormVersion.data_snapshot).where(
+                FormVersion.form_instance_id == form_id,
+                FormVersion.created_at <= target_timestamp
+            ).order_by(FormVersion.created_at.desc(), FormVersion.id.desc()).limit(1)
+        ).first()
+        
+        # Replay drops cleared fields; the snapshot keeps them as None
+        state = {}
+        delta = [ChangeEvent.timestamp <= target_timestamp]
+        if snapshot:
+            state = {k: v for k, v in (snapshot.data_snapshot or {}).items() if v is not None}
+            delta.append(or_(
+                # Events sharing the snapshot's timestamp may or may not be in
+                # it; replaying them again in order gives the same result.
+                # Compared to the stored value (SQLite keeps timestamps as text)
+                ChangeEvent.timestamp >= select(FormVersion.created_at).where(
+                    FormVersion.id == snapshot.id
+                ).scalar_subquery(),
+                # Pseudo-fields such as _title are not part of the form data
+                ChangeEvent.field_id.startswith("_", autoescape=True),
+            ))
+        
+        # Two plain columns, streamed in batches (a server-side cursor on
+        # PostgreSQL): no ORM rows, and memory stays flat however long the log
+        stmt = select(ChangeEvent.field_id, ChangeEvent.new_value).where(
             ChangeEvent.form_instance_id == form_id,
-            ChangeEvent.timestamp <= target_timestamp,
-            ChangeEvent.field_id != "_system"  # Exclude system events
-        ).order_by(ChangeEvent.timestamp.asc()).all()
+            ChangeEvent.field_id != "_system",  # Exclude system events
+            *delta
+        ).order_by(ChangeEvent.timestamp.asc(), ChangeEvent.id.asc())
+        events = db.execute(stmt.execution_options(yield_per=2000))
         
         # Replay events to build state
-        state = {}
-        for event in events:
-            if event.new_value is not None:
-                state[event.field_id] = event.new_value
-            elif event.field_id in state:
-                del state[event.field_id]
+        for field_id, new_value in events:
+            if new_value is not None:
+                state[field_id] = new_value
+            elif field_id in state:
+                del state[field_id]
         
         return state
     
@@ -120,14 +248,36 @@ class AuditService:
         from_version_id: int,
         to_version_id: int
     ) -> List[Dict[str, Any]]:
-        """Get the diff between two versions."""
-        # Get both versions
-        from_version = db.query(FormVersion).filter(
-            FormVersion.id == from_version_id
-        ).first()
-        to_version = db.query(FormVersion).filter(
-            FormVersion.id == to_version_id
-        ).first()
+        """
+        Get the diff between two versions of a form.
+        
+        On PostgreSQL the snapshots are compared in the database and only
+        changed keys come back; elsewhere both are loaded and compared here.
+        Returns [] unless both versions belong to the form.
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            rows = db.execute(VERSION_DIFF_SQL, {
+                "form_id": form_id,
+                "from_version_id": from_version_id,
+                "to_version_id": to_version_id,
+            }).all()
+            return [
+                AuditService._change(row.field_id, row.old_value, row.new_value)
+                for row in rows
+            ]
+        
+        # Get both snapshots in one round trip, without the other columns
+        versions = {
+            version.id: version
+            for version in db.query(FormVersion).options(
+                load_only(FormVersion.data_snapshot)
+            ).filter(
+                FormVersion.id.in_([from_version_id, to_version_id]),
+                FormVersion.form_instance_id == form_id
+            )
+        }
+        from_version = versions.get(from_version_id)
+        to_version = versions.get(to_version_id)
         
         if not from_version or not to_version:
             return []
@@ -139,60 +289,55 @@ class AuditService:
         changes = []
         all_keys = set(from_data.keys()) | set(to_data.keys())
         
-        for key in all_keys:
+        for key in sorted(all_keys):
             old_val = from_data.get(key)
             new_val = to_data.get(key)
             
             if old_val != new_val:
-                changes.append({
-                    "field_id": key,
-                    "old_value": old_val,
-                    "new_value": new_val,
-                    "change_type": "added" if old_val is None else (
-                        "removed" if new_val is None else "modified"
-                    ),
-                })
+                changes.append(AuditService._change(key, old_val, new_val))
         
         return changes
     
+    @staticmethod
+    def _change(field_id: str, old_value: Any, new_value: Any) -> Dict[str, Any]:
+        """One entry of a version diff."""
+        return {
+            "field_id": field_id,
+            "old_value": old_value,
+            "new_value": new_value,
+            "change_type": "added" if old_value is None else (
+                "removed" if new_value is None else "modified"
+            ),
+        }
+    
     @staticmethod
     def get_activity_summary(
         db: Session,
         form_id: int
     ) -> Dict[str, Any]:
-        """Get activity summary for a form."""
-        # Count by user
-        user_counts = db.query(
-            ChangeEvent.user_id,
-            func.count(ChangeEvent.id).label('count')
-        ).filter(
-            ChangeEvent.form_instance_id == form_id
-        ).group_by(ChangeEvent.user_id).all()
-        
-        # Count by field
-        field_counts = db.query(
-            ChangeEvent.field_id,
-            func.count(ChangeEvent.id).label('count')
-        ).filter(
-            ChangeEvent.form_instance_id == form_id,
-            ChangeEvent.field_id != "_system"
-        ).group_by(ChangeEvent.field_id).order_by(
-            func.count(ChangeEvent.id).desc()
-        ).limit(10).all()
-        
-        # Get date range
-        first_event = db.query(ChangeEvent).filter(
-            ChangeEvent.form_instance_id == form_id
-        ).order_by(ChangeEvent.timestamp.asc()).first()
+        """
+        Get activity summary for a form.
         
-        last_event = db.query(ChangeEvent).filter(
-            ChangeEvent.form_instance_id == form_id
-        ).order_by(ChangeEvent.timestamp.desc()).first()
+        Read from the rollup tables that every ChangeEvent insert updates
+        (see record_activity): primary key and index lookups, not a scan of
+        the form's audit log.
+        """
+        stats = db.get(FormActivityStats, form_id)
+        user_counts = db.execute(
+            select(FormUserStats.user_id, FormUserStats.change_count)
+            .where(FormUserStats.form_instance_id == form_id)
+        ).all()
+        field_counts = db.execute(
+            select(FormFieldStats.field_id, FormFieldStats.change_count)
+            .where(FormFieldStats.form_instance_id == form_id)
+            .order_by(FormFieldStats.change_count.desc())
+            .limit(10)
+        ).all()
         
         return {
-            "total_changes": sum(c[1] for c in user_counts),
+            "total_changes": stats.total_changes if stats else 0,
             "changes_by_user": [{"user_id": c[0], "count": c[1]} for c in user_counts],
             "most_edited_fields": [{"field_id": c[0], "count": c[1]} for c in field_counts],
-            "first_activity": first_event.timestamp.isoformat() if first_event else None,
-            "last_activity": last_event.timestamp.isoformat() if last_event else None,
+            "first_activity": stats.first_activity.isoformat() if stats else None,
+            "last_activity": stats.last_activity.isoformat() if stats else None,
         }
@@ -7,17 +7,46 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event, inspect, lambda_stmt, select
+from sqlalchemy.orm import Session, object_session
 
 from app.config import get_settings
 from app.database import get_db
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, TokenData
+from app.services.cache import CacheService
 
 settings = get_settings()
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.bcrypt_rounds)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+USER_EMAIL_KEY = "user:email:{email}"
+# Session.info key for login cache entries to drop once the session commits
+_STALE_LOGIN_EMAILS = "stale_login_emails"
+
+
+def _user_to_cache(user: User) -> dict:
+    """The columns a login needs: the password hash and every UserResponse field."""
+    return {
+        "id": user.id,
+        "email": user.email,
+        "hashed_password": user.hashed_password,
+        "full_name": user.full_name,
+        "role": user.role.value,
+        "is_active": user.is_active,
+        "created_at": user.created_at.isoformat(),
+        "updated_at": user.updated_at.isoformat() if user.updated_at else None,
+    }
+
+
+def _user_from_cache(data: dict) -> User:
+    """Rebuild a transient (session-less) User from _user_to_cache output."""
+    data["role"] = UserRole(data["role"])
+    for field in ("created_at", "updated_at"):
+        if data[field] is not None:
+            data[field] = datetime.fromisoformat(data[field])
+    return User(**data)
+
 
 class AuthService:
     """Service for authentication operations."""
@@ -47,12 +76,14 @@ class AuthService:
     @staticmethod
     def get_user_by_email(db: Session, email: str) -> Optional[User]:
         """Get a user by email."""
-        return db.query(User).filter(User.email == email).first()
+        stmt = lambda_stmt(lambda: select(User).where(User.email == email))
+        return db.execute(stmt).scalars().first()
     
     @staticmethod
     def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
-        """Get a user by ID."""
-        return db.query(User).filter(User.id == user_id).first()
+        """Get a user by ID (runs on every authenticated request)."""
+        stmt = lambda_stmt(lambda: select(User).where(User.id == user_id))
+        return db.execute(stmt).scalars().first()
     
     @staticmethod
     def create_user(db: Session, user_data: UserCreate) -> User:
@@ -77,10 +108,28 @@ class AuthService:
         db.refresh(db_user)
         return db_user
     
+    @staticmethod
+    def get_login_user(db: Session, email: str) -> Optional[User]:
+        """
+        Get the user for a login attempt, from the cache when available.
+        
+        A cache hit returns a transient User that is not attached to the
+        session; it is only good for reading the cached columns.
+        """
+        key = USER_EMAIL_KEY.format(email=email)
+        cached = CacheService.get_json(key)
+        if cached is not None:
+            return _user_from_cache(cached)
+        
+        user = AuthService.get_user_by_email(db, email)
+        if user is not None:
+            CacheService.set_json(key, _user_to_cache(user), settings.user_cache_ttl)
+        return user
+    
     @staticmethod
     def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
         """Authenticate a user by email and password."""
-        user = AuthService.get_user_by_email(db, email)
+        user = AuthService.get_login_user(db, email)
         if not user:
             return None
         if not AuthService.verify_password(password, user.hashed_password):
@@ -88,11 +137,16 @@ class AuthService:
         return user
 
 
-async def get_current_user(
+def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
-    """Dependency to get the current authenticated user."""
+    """
+    Dependency to get the current authenticated user.
+    
+    Declared sync so FastAPI runs the user lookup in its threadpool
+    instead of blocking the event loop on every authenticated request.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -138,3 +192,26 @@ def require_role(*roles: UserRole):
             )
         return current_user
     return role_checker
+
+
+@event.listens_for(User, "after_update")
+def _mark_login_cache_stale(mapper, connection, target: User) -> None:
+    """Note a changed user's cached login records (password, role, status, email)."""
+    # Not deleted yet: a login between this flush and the commit would read
+    # the old committed row and cache it again
+    emails = {target.email, *inspect(target).attrs.email.history.deleted}
+    object_session(target).info.setdefault(_STALE_LOGIN_EMAILS, set()).update(emails)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_login_cache(session: Session) -> None:
+    """Drop the cached login records of users changed in the committed transaction."""
+    emails = session.info.pop(_STALE_LOGIN_EMAILS, None)
+    if emails:
+        CacheService.delete(*[USER_EMAIL_KEY.format(email=email) for email in emails])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stale_logins(session: Session) -> None:
+    """Rolled-back changes never reached the database; the cache is still right."""
+    session.info.pop(_STALE_LOGIN_EMAILS, None)
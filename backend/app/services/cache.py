@@ -0,0 +1,74 @@
+"""Optional Redis cache for small, hot lookups."""
+
+import json
+from functools import lru_cache
+from typing import Any, Optional
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# A slow cache must not be slower than the query it replaces
+SOCKET_TIMEOUT = 0.25  # seconds
+
+
+@lru_cache()
+def _redis_client():
+    """Shared Redis client; redis is only required when REDIS_URL is set."""
+    import redis
+    return redis.Redis.from_url(
+        settings.redis_url,
+        socket_timeout=SOCKET_TIMEOUT,
+        socket_connect_timeout=SOCKET_TIMEOUT,
+    )
+
+
+class CacheService:
+    """
+    JSON get/set/delete against Redis.
+
+    Every call is a no-op when no Redis URL is configured, and Redis errors are
+    treated as cache misses so callers always fall back to the database.
+    """
+
+    @staticmethod
+    def is_enabled() -> bool:
+        """Whether a Redis cache is configured."""
+        return bool(settings.redis_url)
+
+    @staticmethod
+    def get_json(key: str) -> Optional[Any]:
+        """Cached value for a key, or None on a miss."""
+        if not CacheService.is_enabled():
+            return None
+        from redis.exceptions import RedisError
+
+        try:
+            raw = _redis_client().get(key)
+        except RedisError:
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    @staticmethod
+    def set_json(key: str, value: Any, ttl: int) -> None:
+        """Cache a JSON-serializable value for ttl seconds."""
+        if not CacheService.is_enabled():
+            return
+        from redis.exceptions import RedisError
+
+        try:
+            _redis_client().set(key, json.dumps(value), ex=ttl)
+        except RedisError:
+            pass
+
+    @staticmethod
+    def delete(*keys: str) -> None:
+        """Drop cached keys; stale entries otherwise expire with their TTL."""
+        if not CacheService.is_enabled():
+            return
+        from redis.exceptions import RedisError
+
+        try:
+            _redis_client().delete(*keys)
+        except RedisError:
+            pass
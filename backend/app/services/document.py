@@ -1,24 +1,383 @@
 """Document generation service for DOCX and PDF output."""
 
+import hashlib
+import io
+import logging
 import os
-import shutil
+import queue
 import subprocess
 import re
-from typing import Optional, Dict, Any, Tuple
-from datetime import datetime
+import tempfile
+import threading
+import time
+from bisect import bisect_right
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterator, Optional, Dict, Any, List, Set, Tuple
+from datetime import datetime, timedelta, timezone
 
+import orjson
+from lxml import etree
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
-from fastapi import HTTPException, status
+from fastapi import BackgroundTasks, HTTPException, status
 from docx import Document
-from docx.table import Table
+from docx.oxml.ns import nsmap
+from docx.table import Table, _Cell
 from docx.text.paragraph import Paragraph
 from docx.shared import RGBColor
 
 from app.config import get_settings
+from app.database import SessionLocal
 from app.models.template import Template
 from app.models.form import FormInstance, FormVersion, FormData
+from app.models.document import DocumentJob, DocumentJobStatus
+from app.models.user import User
+from app.services.storage import StorageService, DOCX_MEDIA_TYPE, PDF_MEDIA_TYPE
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# (form_id, version_id) pairs queued for background generation, so that
+# clients polling a pending download don't queue the same work twice
+_pending_generations: Set[Tuple[int, int]] = set()
+_pending_lock = threading.Lock()
+
+# Background generations that failed, with the error and when, so polls
+# report the failure instead of queueing the same doomed work again.
+# Guarded by _pending_lock; a failure is retried once it is this old.
+_failed_generations: Dict[Tuple[int, int], Tuple[str, float]] = {}
+GENERATION_RETRY_AFTER = timedelta(minutes=5)
+
+# Jobs run as background tasks, which don't survive a restart; one still
+# pending or running after this long was lost and is reported as failed
+JOB_STALE_AFTER = timedelta(minutes=10)
+
+# Renders are cached under a hash of their inputs. Bump this when the fill
+# or conversion output changes, so renders from an older build aren't reused.
+RENDER_CACHE_VERSION = 1
+_CANONICAL_JSON = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+
+
+@lru_cache(maxsize=8)
+def _template_bytes(template_path: str, mtime_ns: int, size: int) -> bytes:
+    """A template file's contents; the stat fields key out a replaced file."""
+    with open(template_path, "rb") as f:
+        return f.read()
+
+
+def _uno_property(name: str, value: Any) -> Any:
+    """A com.sun.star.beans.PropertyValue, for UNO load and store arguments."""
+    from com.sun.star.beans import PropertyValue
+
+    prop = PropertyValue()
+    prop.Name = name
+    prop.Value = value
+    return prop
+
+
+def _uno_errors() -> Tuple[type, ...]:
+    """
+    Errors a UNO conversion fails with when the listener can't be used: uno
+    missing, soffice failing to start, or the bridge or document call
+    failing. These fall back to a one-off soffice run; anything else is a bug.
+    """
+    errors: Tuple[type, ...] = (ImportError, OSError, RuntimeError)
+    try:
+        import uno  # installs the com.sun.star import hook
+        from com.sun.star.uno import Exception as UnoException
+    except ImportError:
+        return errors
+    return errors + (UnoException,)
+
+
+class _LibreOfficeServer:
+    """
+    A headless soffice kept running with a UNO listener, for PDF conversion.
+    
+    Starting LibreOffice dominates a one-off soffice --convert-to run; a
+    listener pays that once and then converts each document over UNO.
+    soffice is started on first use and restarted after it dies. A
+    worker is checked out of the pool by one conversion at a time. The
+    uno module ships with LibreOffice and is only required when
+    LIBREOFFICE_UNO is set.
+    """
+    
+    START_TIMEOUT = 30  # seconds
+    
+    def __init__(self, name: str, profile_url: str):
+        # Named pipes are per host; the pid keeps app workers apart
+        self.connection = f"pipe,name={name};urp;"
+        self.profile_url = profile_url
+        self._process: Optional[subprocess.Popen] = None
+        self._desktop: Any = None
+    
+    def _start(self) -> None:
+        """Launch soffice and connect to its desktop once the listener is up."""
+        import uno
+        from com.sun.star.connection import NoConnectException
+        
+        self.stop()
+        self._process = subprocess.Popen(
+            [
+                settings.libreoffice_path,
+                f'-env:UserInstallation={self.profile_url}',
+                '--headless',
+                '--invisible',
+                '--nologo',
+                '--norestore',
+                '--nodefault',
+                f'--accept={self.connection}',
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_context
+        )
+        deadline = time.monotonic() + self.START_TIMEOUT
+        while True:
+            try:
+                context = resolver.resolve(f"uno:{self.connection}StarOffice.ComponentContext")
+                break
+            except NoConnectException:
+                if self._process.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError("LibreOffice listener did not start")
+                time.sleep(0.1)
+        
+        self._desktop = context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", context
+        )
+    
+    def convert(self, docx_path: str, pdf_path: str) -> None:
+        """Export a DOCX to PDF, (re)starting soffice if it isn't running."""
+        import uno
+        
+        try:
+            if self._process is None or self._process.poll() is not None:
+                self._start()
+            document = self._desktop.loadComponentFromURL(
+                uno.systemPathToFileUrl(os.path.abspath(docx_path)),
+                "_blank",
+                0,
+                (_uno_property("Hidden", True),),
+            )
+            try:
+                document.storeToURL(
+                    uno.systemPathToFileUrl(os.path.abspath(pdf_path)),
+                    (_uno_property("FilterName", "writer_pdf_Export"),),
+                )
+            finally:
+                document.close(True)
+        except Exception:
+            # A broken bridge doesn't recover, and a one-off soffice run on
+            # this profile would hand its work to the listener; stop it
+            self.stop()
+            raise
+    
+    def stop(self) -> None:
+        """Shut soffice down if it is running."""
+        process, self._process, self._desktop = self._process, None, None
+        if process is not None and process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+# One LibreOffice worker, with its own user profile and listener, per
+# concurrent conversion. soffice hands work to an instance already running
+# on the same profile, so parallel conversions sharing one would collide; a
+# profile is also initialized only on its first use, which later
+# conversions then skip.
+# Built on first use in each process rather than at import: names and
+# profiles carry the pid, and app workers forked from a preloading parent
+# must not share (or stop) the parent's.
+_libreoffice_lock = threading.Lock()
+_libreoffice_pid: Optional[int] = None
+_libreoffice_workers: List[_LibreOfficeServer] = []
+_libreoffice_pool: "queue.Queue[_LibreOfficeServer]" = queue.Queue()
+
+
+def _libreoffice_worker_pool() -> "queue.Queue[_LibreOfficeServer]":
+    """This process's pool of LibreOffice workers, created on first call."""
+    global _libreoffice_pid, _libreoffice_workers, _libreoffice_pool
+    
+    pid = os.getpid()
+    with _libreoffice_lock:
+        if _libreoffice_pid != pid:
+            _libreoffice_workers = [
+                _LibreOfficeServer(
+                    f"lo_listener_{pid}_{slot}",
+                    Path(os.path.join(tempfile.gettempdir(), f"lo_profile_{pid}_{slot}")).as_uri(),
+                )
+                for slot in range(max(1, settings.libreoffice_workers))
+            ]
+            _libreoffice_pool = queue.Queue()
+            for worker in _libreoffice_workers:
+                _libreoffice_pool.put(worker)
+            _libreoffice_pid = pid
+        return _libreoffice_pool
+
+
+@contextmanager
+def _libreoffice_worker() -> Iterator[_LibreOfficeServer]:
+    """Check out a free LibreOffice worker, waiting if all are in use."""
+    pool = _libreoffice_worker_pool()
+    worker = pool.get()
+    try:
+        yield worker
+    finally:
+        pool.put(worker)
+
+# Where a paragraph expects its value, in order of preference: a run of
+# underscores, or after a colon or question mark ending the text. One
+# search's leftmost match keeps that order, as only whitespace can follow
+# a trailing colon or question mark.
+_PLACEHOLDER_PATTERN = re.compile(r'_+|:\s*$|\?\s*$')
+
+
+def _format_text(value: Any) -> str:
+    """Text written for a field value: lists comma-joined, empty values blank."""
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value)
+    return str(value) if value else ""
+
+
+def _format_checkbox(value: Any) -> str:
+    """Text written for a single checkbox, or its selected options if a list."""
+    if isinstance(value, list):
+        return _format_text(value)
+    return "☑" if value else "☐"
+
+
+# Formatter per field type, bound to each field once per fill
+_FIELD_FORMATTERS: Dict[str, Callable[[Any], str]] = {
+    "checkbox": _format_checkbox,
+}
+
+
+# The elements python-docx reads a run's text from, and those of a paragraph:
+# its runs' and its hyperlinks' runs'. Compiled once; python-docx evaluates
+# an uncompiled XPath per run on every .text access.
+_RUN_TEXT_ELEMENTS = "w:br | w:cr | w:noBreakHyphen | w:ptab | w:t | w:tab"
+_RUN_TEXT_XPATH = etree.XPath(_RUN_TEXT_ELEMENTS, namespaces=nsmap)
+_PARAGRAPH_TEXT_XPATH = etree.XPath(
+    " | ".join(
+        f"{parent}/{element.strip()}"
+        for parent in ("w:r", "w:hyperlink/w:r")
+        for element in _RUN_TEXT_ELEMENTS.split("|")
+    ),
+    namespaces=nsmap,
+)
+
+
+def _paragraph_text(para: Paragraph) -> str:
+    """para.text, from one compiled XPath over the paragraph (results come in document order)."""
+    return "".join(str(e) for e in _PARAGRAPH_TEXT_XPATH(para._p))
+
+
+def _run_text(run: Any) -> str:
+    """run.text, from one compiled XPath over the run."""
+    return "".join(str(e) for e in _RUN_TEXT_XPATH(run._r))
+
+
+class _DocumentIndex:
+    """
+    A document's body paragraphs and tables, collected once per fill.
+    
+    python-docx rebuilds doc.paragraphs and doc.tables, and each
+    paragraph's text, from the XML on every access. Fields look their
+    anchors up here instead; a paragraph's lowered text is refreshed
+    whenever a value is written into it, and a table's cells are
+    re-expanded after rows are added to it.
+    """
+    
+    def __init__(self, doc: Document):
+        self.paragraphs: List[Paragraph] = doc.paragraphs
+        self.lowered: List[str] = [_paragraph_text(para).lower() for para in self.paragraphs]
+        self.tables: List[Table] = doc.tables
+        # All lowered texts NUL-joined (XML text never contains NUL), with
+        # each paragraph's start offset; rebuilt lazily after a refresh
+        self._joined: Optional[str] = None
+        self._starts: List[int] = []
+        self._cells: Dict[int, List[List[_Cell]]] = {}
+    
+    def refresh(self, i: int) -> None:
+        """Re-read paragraph i's text after it was modified."""
+        self.lowered[i] = _paragraph_text(self.paragraphs[i]).lower()
+        self._joined = None
+    
+    def _join(self) -> str:
+        if self._joined is None:
+            self._joined = "\x00".join(self.lowered)
+            self._starts = []
+            offset = 0
+            for text in self.lowered:
+                self._starts.append(offset)
+                offset += len(text) + 1
+        return self._joined
+    
+    def find(self, needle: str) -> Optional[int]:
+        """Index of the first paragraph whose lowered text contains needle (already lowered)."""
+        # One scan in C over the whole body instead of one per paragraph
+        position = self._join().find(needle) if "\x00" not in needle else -1
+        if position < 0:
+            return None
+        return bisect_right(self._starts, position) - 1
+    
+    def find_all(self, needle: str) -> List[int]:
+        """Indexes of every paragraph whose lowered text contains needle (already lowered)."""
+        if not needle:
+            return list(range(len(self.lowered)))
+        if "\x00" in needle:
+            return []
+        
+        joined = self._join()
+        found = []
+        position = joined.find(needle)
+        while position >= 0:
+            i = bisect_right(self._starts, position) - 1
+            found.append(i)
+            # Resume at the next paragraph; one hit per paragraph is enough
+            next_start = self._starts[i + 1] if i + 1 < len(self._starts) else len(joined)
+            position = joined.find(needle, next_start)
+        return found
+    
+    def table(self, table_index: int) -> Optional[Table]:
+        """Table by body position, or None if there is no such table."""
+        if table_index >= len(self.tables):
+            return None
+        return self.tables[table_index]
+    
+    def cells(self, table_index: int) -> Optional[List[List[_Cell]]]:
+        """
+        A table's cells by row, merged cells expanded, or None if there is no such table.
+        
+        row.cells expands the whole table to return a single row, so reading
+        a table row by row is quadratic in its size. Each table is expanded
+        once here and sliced by its grid width, as python-docx's own
+        row_cells does.
+        """
+        cells = self._cells.get(table_index)
+        if cells is None:
+            table = self.table(table_index)
+            if table is None:
+                return None
+            grid = table._cells
+            width = table._column_count
+            cells = [grid[start:start + width] for start in range(0, len(grid), width)] if width else []
+            self._cells[table_index] = cells
+        return cells
+    
+    def forget_cells(self, table_index: int) -> None:
+        """Drop a table's expanded cells after its rows changed."""
+        self._cells.pop(table_index, None)
 
 
 class DocumentService:
@@ -30,15 +389,25 @@ class DocumentService:
         Flatten a nested dictionary to dot-notation keys.
 
         Example: {'personnel': {'pi_name': 'John'}} -> {'personnel.pi_name': 'John'}
+        
+        Walks the nesting with a stack of item iterators rather than
+        recursion, writing leaves straight into one dict in depth-first
+        order; fields are filled in this order.
         """
-        items = []
-        for k, v in d.items():
-            new_key = f"{parent_key}{sep}{k}" if parent_key else k
-            if isinstance(v, dict):
-                items.extend(DocumentService._flatten_dict(v, new_key, sep).items())
+        flat: Dict[str, Any] = {}
+        stack = [(parent_key, iter(d.items()))]
+        while stack:
+            prefix, items = stack[-1]
+            for k, v in items:
+                new_key = f"{prefix}{sep}{k}" if prefix else k
+                if isinstance(v, dict):
+                    # Descend; this level resumes after the nested dict
+                    stack.append((new_key, iter(v.items())))
+                    break
+                flat[new_key] = v
             else:
-                items.append((new_key, v))
-        return dict(items)
+                stack.pop()
+        return flat
 
     @staticmethod
     def generate_documents(
@@ -49,58 +418,114 @@ class DocumentService:
         """
         Generate filled DOCX and PDF for a form version.
         
-        Returns tuple of (docx_path, pdf_path).
+        A render of the same template, schema and data is reused rather than
+        repeated. Returns tuple of (docx_path, pdf_path).
         """
-        # Get form and template
-        form = db.query(FormInstance).filter(FormInstance.id == form_id).first()
-        if not form:
+        # Form, template and data (from version or current) in one round
+        # trip; outer joins tell a missing template or version from a
+        # missing form
+        if version_id:
+            data_source = FormVersion
+            data_column = FormVersion.data_snapshot
+            data_join = and_(
+                FormVersion.id == version_id,
+                FormVersion.form_instance_id == FormInstance.id
+            )
+        else:
+            data_source = FormData
+            data_column = FormData.data
+            data_join = FormData.form_instance_id == FormInstance.id
+        
+        row = db.query(
+            Template.id.label("template_id"),
+            Template.original_file_path,
+            Template.schema,
+            data_source.id.label("data_id"),
+            data_column.label("data"),
+        ).select_from(FormInstance).outerjoin(
+            Template, Template.id == FormInstance.template_id
+        ).outerjoin(
+            data_source, data_join
+        ).filter(FormInstance.id == form_id).first()
+        
+        if not row:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Form not found"
             )
-        
-        template = db.query(Template).filter(Template.id == form.template_id).first()
-        if not template:
+        if row.template_id is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Template not found"
             )
+        if version_id and row.data_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Version not found"
+            )
+        form_data = row.data if row.data_id is not None else {}
         
-        # Get form data (from version or current)
-        if version_id:
-            version = db.query(FormVersion).filter(FormVersion.id == version_id).first()
-            if not version:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Version not found"
-                )
-            form_data = version.data_snapshot
-        else:
-            form_data_record = db.query(FormData).filter(
-                FormData.form_instance_id == form_id
-            ).first()
-            form_data = form_data_record.data if form_data_record else {}
-        
-        # Generate filled DOCX
-        docx_path = DocumentService._fill_docx(
-            template_path=template.original_file_path,
-            schema=template.schema,
-            data=form_data,
-            form_id=form_id,
-            version_id=version_id
-        )
+        # Same template, schema and data render the same documents; reuse them
+        render_key = DocumentService._render_key(row.original_file_path, row.schema, form_data)
+        cached_docx_path, cached_pdf_path = DocumentService._render_paths(form_id, render_key)
+        cached = DocumentService.existing_document_paths(cached_docx_path, cached_pdf_path)
         
-        # Convert to PDF
-        pdf_path = DocumentService._convert_to_pdf(docx_path)
+        if cached:
+            docx_path, pdf_path = cached
+        else:
+            # Generate filled DOCX
+            docx_path = DocumentService._fill_docx(
+                template_path=row.original_file_path,
+                schema=row.schema,
+                data=form_data,
+                form_id=form_id,
+                version_id=version_id
+            )
+            
+            # Convert to PDF
+            pdf_path = DocumentService._convert_to_pdf(docx_path)
+            
+            # Move both into the cache in one step each, so a concurrent
+            # render of the same key never sees a partial file
+            os.replace(docx_path, cached_docx_path)
+            os.replace(pdf_path, cached_pdf_path)
+            docx_path, pdf_path = cached_docx_path, cached_pdf_path
+            
+            # Publish to object storage so downloads don't stream through the app
+            if StorageService.is_remote():
+                StorageService.upload(docx_path, DOCX_MEDIA_TYPE)
+                StorageService.upload(pdf_path, PDF_MEDIA_TYPE)
         
         # Update version with document paths if version_id provided
         if version_id:
-            version.generated_docx_path = docx_path
-            version.generated_pdf_path = pdf_path
+            db.query(FormVersion).filter(FormVersion.id == version_id).update({
+                FormVersion.generated_docx_path: docx_path,
+                FormVersion.generated_pdf_path: pdf_path,
+            })
             db.commit()
         
         return docx_path, pdf_path
     
+    @staticmethod
+    def _render_key(template_path: str, schema: Dict[str, Any], data: Dict[str, Any]) -> str:
+        """Hash of everything a render depends on: the template file, its schema and the data."""
+        # Replacing the template file changes its mtime and size
+        template_stat = os.stat(template_path)
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(
+            f"{RENDER_CACHE_VERSION}:{template_path}:"
+            f"{template_stat.st_mtime_ns}:{template_stat.st_size}".encode()
+        )
+        digest.update(orjson.dumps(schema, option=_CANONICAL_JSON))
+        digest.update(orjson.dumps(data, option=_CANONICAL_JSON))
+        return digest.hexdigest()
+    
+    @staticmethod
+    def _render_paths(form_id: int, render_key: str) -> Tuple[str, str]:
+        """Cached (docx_path, pdf_path) for a render key."""
+        stem = os.path.join(settings.generated_dir, str(form_id), f"render_{render_key}")
+        return f"{stem}.docx", f"{stem}.pdf"
+    
     @staticmethod
     def _fill_docx(
         template_path: str,
@@ -120,15 +545,20 @@ class DocumentService:
         output_filename = f"form_{form_id}{version_suffix}_{timestamp}.docx"
         output_path = os.path.join(output_dir, output_filename)
         
-        # Copy template to output
-        shutil.copy(template_path, output_path)
-        
-        # Open and fill document
-        doc = Document(output_path)
+        # Open the template from memory; the filled document is written once
+        template_stat = os.stat(template_path)
+        doc = Document(io.BytesIO(
+            _template_bytes(template_path, template_stat.st_mtime_ns, template_stat.st_size)
+        ))
+        index = _DocumentIndex(doc)
         fields = schema.get("fields", [])
 
-        # Build field lookup by ID
+        # Build field lookup by ID, and each field's value formatter
         field_map = {f["id"]: f for f in fields}
+        formatter_map = {
+            f["id"]: _FIELD_FORMATTERS.get(f.get("type", "text"), _format_text)
+            for f in fields
+        }
 
         # Flatten nested data to dot-notation keys (e.g., personnel.pi_name)
         flat_data = DocumentService._flatten_dict(data)
@@ -149,18 +579,18 @@ class DocumentService:
             combined_contact = " | ".join(parts)
 
             # Write to the merged row 9 cell
-            if len(doc.tables) > 1:
-                table = doc.tables[1]
-                if len(table.rows) > 9:
-                    cell = table.rows[9].cells[0]
-                    if cell.paragraphs:
-                        para = cell.paragraphs[0]
-                        para.clear()
-                        para.add_run(combined_contact)
-                    else:
-                        cell.text = combined_contact
-
-        # Fill each field
+            row_cells = DocumentService._row_cells(index, 1, 9)
+            if row_cells:
+                cell = row_cells[0]
+                if cell.paragraphs:
+                    para = cell.paragraphs[0]
+                    para.clear()
+                    para.add_run(combined_contact)
+                else:
+                    cell.text = combined_contact
+
+        # Fill each field; cell-anchored ones are collected for a second pass
+        cell_fields = []
         for field_id, value in flat_data.items():
             # Skip contact fields as they were handled above
             if field_id in contact_fields:
@@ -172,22 +602,34 @@ class DocumentService:
             if not field_def:
                 continue
 
-            field_type = field_def.get("type", "text")
+            formatter = formatter_map[field_id]
 
             # Handle checkbox fields specially
-            if field_type == "checkbox" and isinstance(value, list):
-                DocumentService._fill_checkbox_field(doc, value, field_def)
+            if formatter is _format_checkbox and isinstance(value, list):
+                DocumentService._fill_checkbox_field(index, value, field_def)
                 continue
 
             anchor = field_def.get("anchor")
             if not anchor:
                 continue
 
-            DocumentService._write_value_to_anchor(doc, anchor, value, field_def)
+            if anchor.get("type") == "table_cell":
+                cell_fields.append((DocumentService._cell_position(anchor), value))
+                continue
+
+            DocumentService._write_value_to_anchor(index, anchor, value, field_def, formatter)
+
+        # Cells in table, row, column order (stable for duplicates), after
+        # repeatable tables have added their rows
+        cell_fields.sort(key=lambda item: item[0])
+        for (table_index, row_index, column_index), value in cell_fields:
+            row_cells = DocumentService._row_cells(index, table_index, row_index)
+            if row_cells is not None and column_index < len(row_cells):
+                DocumentService._write_cell(row_cells[column_index], value)
 
         # Fix header table borders for LibreOffice compatibility
         # Table 0 Cell 0 (logo) should have no visible borders
-        DocumentService._fix_header_table_borders(doc)
+        DocumentService._fix_header_table_borders(index)
 
         # Save the filled document
         doc.save(output_path)
@@ -195,7 +637,7 @@ class DocumentService:
         return output_path
 
     @staticmethod
-    def _fix_header_table_borders(doc: Document) -> None:
+    def _fix_header_table_borders(index: _DocumentIndex) -> None:
         """
         Fix header table (Table 0) borders for LibreOffice compatibility.
         Cell 0 (logo area) should have no visible borders.
@@ -203,15 +645,12 @@ class DocumentService:
         from docx.oxml.ns import qn
         from docx.oxml import OxmlElement
 
-        if len(doc.tables) == 0:
-            return
-
-        table = doc.tables[0]
-        if len(table.rows) == 0:
+        row_cells = DocumentService._row_cells(index, 0, 0)
+        if not row_cells:
             return
 
         # Fix Cell 0 (logo cell) - remove all borders
-        cell = table.rows[0].cells[0]
+        cell = row_cells[0]
         tc = cell._tc
         tc_pr = tc.get_or_add_tcPr()
 
@@ -230,7 +669,7 @@ class DocumentService:
 
     @staticmethod
     def _fill_checkbox_field(
-        doc: Document,
+        index: _DocumentIndex,
         selected_values: list,
         field_def: Dict[str, Any]
     ) -> None:
@@ -239,130 +678,118 @@ class DocumentService:
 
         options = field_def.get("options", [])
 
-        # Build a map of option values to their labels
-        option_labels = {opt.get("value"): opt.get("label", opt.get("value")) for opt in options}
+        # Build a map of option values to their lowered labels
+        option_labels = {
+            opt.get("value"): opt.get("label", opt.get("value")).lower() for opt in options
+        }
+
+        # Only paragraphs containing some option's label need checking; each
+        # label is found with one scan of the body. Updating a paragraph
+        # changes no other, so the candidates can be collected up front.
+        candidates = sorted({
+            i for opt_label in set(option_labels.values()) for i in index.find_all(opt_label)
+        })
 
-        # Find paragraphs containing checkbox options and update them
-        for para in doc.paragraphs:
-            para_text = para.text.strip()
+        # Update the paragraphs containing checkbox options
+        for i in candidates:
+            para = index.paragraphs[i]
+            para_text = index.lowered[i].strip()
 
             # Check each option
             for opt_value, opt_label in option_labels.items():
                 # Check if this paragraph contains this option's label
-                if opt_label.lower() in para_text.lower():
+                if opt_label in para_text:
                     is_selected = opt_value in selected_values
+                    runs = para.runs
 
-                    # Try to find and update form field checkboxes
-                    for run in para.runs:
-                        run_xml = run._r.xml
-                        if 'fldChar' in run_xml or 'checkBox' in run_xml.lower():
-                            # Found a form field - try to update it
-                            for elem in run._r.iter():
-                                # Look for checkbox default value
-                                if elem.tag.endswith('default') or elem.tag.endswith('checked'):
-                                    elem.set(qn('w:val'), '1' if is_selected else '0')
+                    # Try to find and update form field checkboxes. A run's
+                    # XML is part of its paragraph's, so the paragraph is
+                    # checked first with a single serialization.
+                    para_xml = para._p.xml
+                    if 'fldChar' in para_xml or 'checkbox' in para_xml.lower():
+                        for run in runs:
+                            run_xml = run._r.xml
+                            if 'fldChar' in run_xml or 'checkBox' in run_xml.lower():
+                                # Found a form field - try to update it
+                                for elem in run._r.iter():
+                                    # Look for checkbox default value
+                                    if elem.tag.endswith('default') or elem.tag.endswith('checked'):
+                                        elem.set(qn('w:val'), '1' if is_selected else '0')
 
                     # Also try to find and replace checkbox symbols
                     # Common unchecked: ☐ (U+2610), □ (U+25A1)
                     # Common checked: ☑ (U+2611), ☒ (U+2612), ■ (U+25A0)
-                    for run in para.runs:
-                        if '☐' in run.text:
-                            run.text = run.text.replace('☐', '☑' if is_selected else '☐')
-                        elif '□' in run.text:
-                            run.text = run.text.replace('□', '■' if is_selected else '□')
+                    if '☐' in para_text or '□' in para_text:
+                        for run in runs:
+                            run_text = _run_text(run)
+                            if '☐' in run_text:
+                                run.text = run_text.replace('☐', '☑' if is_selected else '☐')
+                            elif '□' in run_text:
+                                run.text = run_text.replace('□', '■' if is_selected else '□')
 
+                    index.refresh(i)
                     break  # Found the option, move to next
 
     @staticmethod
     def _write_value_to_anchor(
-        doc: Document,
+        index: _DocumentIndex,
         anchor: Dict[str, Any],
         value: Any,
-        field_def: Dict[str, Any]
+        field_def: Dict[str, Any],
+        formatter: Callable[[Any], str] = _format_text
     ) -> None:
         """Write a value to the anchored location in the document."""
         anchor_type = anchor.get("type")
         
         if anchor_type == "paragraph":
-            DocumentService._fill_paragraph_anchor(doc, anchor, value, field_def)
+            DocumentService._fill_paragraph_anchor(index, anchor, formatter(value))
         elif anchor_type == "table_cell":
-            DocumentService._fill_table_cell_anchor(doc, anchor, value, field_def)
+            DocumentService._fill_table_cell_anchor(index, anchor, value, field_def)
         elif anchor_type == "table":
-            DocumentService._fill_table_anchor(doc, anchor, value, field_def)
+            DocumentService._fill_table_anchor(index, anchor, value, field_def)
     
     @staticmethod
     def _fill_paragraph_anchor(
-        doc: Document,
+        index: _DocumentIndex,
         anchor: Dict[str, Any],
-        value: Any,
-        field_def: Dict[str, Any]
+        formatted_value: str
     ) -> None:
-        """Fill a paragraph-anchored field."""
-        paragraph_contains = anchor.get("paragraph_contains", "")
+        """Fill a paragraph-anchored field with its formatted value."""
+        paragraph_contains = (anchor.get("paragraph_contains") or "").lower()
         paragraph_index = anchor.get("paragraph_index")
         
-        for i, para in enumerate(doc.paragraphs):
-            # Match by index or by content
-            if paragraph_index is not None and i == paragraph_index:
-                DocumentService._insert_value_in_paragraph(para, value, field_def)
-                return
-            elif paragraph_contains and paragraph_contains.lower() in para.text.lower():
-                DocumentService._insert_value_in_paragraph(para, value, field_def)
-                return
+        # Match by index or by content, whichever paragraph comes first
+        matches = []
+        if isinstance(paragraph_index, int) and 0 <= paragraph_index < len(index.paragraphs):
+            matches.append(paragraph_index)
+        if paragraph_contains:
+            found = index.find(paragraph_contains)
+            if found is not None:
+                matches.append(found)
+        if not matches:
+            return
+        
+        i = min(matches)
+        DocumentService._insert_value_in_paragraph(index.paragraphs[i], formatted_value)
+        index.refresh(i)
     
     @staticmethod
     def _insert_value_in_paragraph(
         para: Paragraph,
-        value: Any,
-        field_def: Dict[str, Any]
+        formatted_value: str
     ) -> None:
-        """Insert value into a paragraph, preserving formatting."""
-        text = para.text
-        field_type = field_def.get("type", "text")
-        
-        # Format value based on type
-        if field_type == "checkbox":
-            if isinstance(value, list):
-                formatted_value = ", ".join(str(v) for v in value)
-            else:
-                formatted_value = "☑" if value else "☐"
-        elif isinstance(value, list):
-            formatted_value = ", ".join(str(v) for v in value)
-        else:
-            formatted_value = str(value) if value else ""
+        """Insert an already formatted value into a paragraph, preserving formatting."""
+        text = _paragraph_text(para)
         
         # Find placeholder pattern (underscores, colon, question mark, or append)
-        patterns = [
-            (r'(_+)', formatted_value),  # Replace underscores
-            (r'(:\s*)$', f': {formatted_value}'),  # Append after colon at end
-            (r'(\?\s*)$', f'? {formatted_value}'),  # Append after question mark at end
-        ]
-
-        matched = False
-        new_text = text
-        for pattern, replacement in patterns:
-            if re.search(pattern, text):
-                new_text = re.sub(pattern, replacement, text, count=1)
-                matched = True
-                break
-
-        # If no pattern matched, append the value at the end
-        if not matched and formatted_value:
-            new_text = f"{text.rstrip()} {formatted_value}"
+        match = _PLACEHOLDER_PATTERN.search(text)
 
         # Split text to separate original label from the filled value
         # so we can make only the value bold
-        if matched:
-            # Find where the value was inserted
-            for pattern, replacement in patterns:
-                match = re.search(pattern, text)
-                if match:
-                    prefix = text[:match.start()]
-                    suffix = text[match.end():]
-                    break
-            else:
-                prefix = text
-                suffix = ""
+        if match:
+            # The value replaces the placeholder
+            prefix = text[:match.start()]
+            suffix = text[match.end():]
 
             # Clear paragraph and add runs with formatting
             para.clear()
@@ -385,36 +812,41 @@ class DocumentService:
     
     @staticmethod
     def _fill_table_cell_anchor(
-        doc: Document,
+        index: _DocumentIndex,
         anchor: Dict[str, Any],
         value: Any,
         field_def: Dict[str, Any]
     ) -> None:
         """Fill a table cell-anchored field."""
-        table_index = anchor.get("table_index", 0)
-        row_index = anchor.get("row_index", 0)
-        column_index = anchor.get("column_index", 1)
-        
-        if table_index >= len(doc.tables):
-            return
-        
-        table = doc.tables[table_index]
-        
-        if row_index >= len(table.rows):
-            return
-        
-        row = table.rows[row_index]
+        table_index, row_index, column_index = DocumentService._cell_position(anchor)
         
-        if column_index >= len(row.cells):
+        row_cells = DocumentService._row_cells(index, table_index, row_index)
+        if row_cells is None or column_index >= len(row_cells):
             return
         
-        cell = row.cells[column_index]
-        
-        # Format value
-        if isinstance(value, list):
-            formatted_value = ", ".join(str(v) for v in value)
-        else:
-            formatted_value = str(value) if value else ""
+        DocumentService._write_cell(row_cells[column_index], value)
+    
+    @staticmethod
+    def _cell_position(anchor: Dict[str, Any]) -> Tuple[int, int, int]:
+        """(table_index, row_index, column_index) of a table cell anchor."""
+        return (
+            anchor.get("table_index", 0),
+            anchor.get("row_index", 0),
+            anchor.get("column_index", 1),
+        )
+    
+    @staticmethod
+    def _row_cells(index: _DocumentIndex, table_index: int, row_index: int) -> Optional[List[_Cell]]:
+        """A row's cells with merged cells expanded, or None if there is no such row."""
+        rows = index.cells(table_index)
+        if rows is None or row_index >= len(rows):
+            return None
+        return rows[row_index]
+    
+    @staticmethod
+    def _write_cell(cell: _Cell, value: Any) -> None:
+        """Replace a cell's text with a formatted value, keeping its first paragraph's style."""
+        formatted_value = _format_text(value)
         
         # Set cell text
         if cell.paragraphs:
@@ -426,7 +858,7 @@ class DocumentService:
     
     @staticmethod
     def _fill_table_anchor(
-        doc: Document,
+        index: _DocumentIndex,
         anchor: Dict[str, Any],
         value: Any,
         field_def: Dict[str, Any]
@@ -438,10 +870,10 @@ class DocumentService:
         table_index = anchor.get("table_index", 0)
         start_row = anchor.get("start_row", 1)  # Default to row 1 if not specified
 
-        if table_index >= len(doc.tables):
+        table = index.table(table_index)
+        if table is None:
             return
 
-        table = doc.tables[table_index]
         repeatable_config = field_def.get("repeatable_config", {})
         columns = repeatable_config.get("columns", [])
 
@@ -449,27 +881,31 @@ class DocumentService:
         # Map logical column index to actual cell index
         column_mapping = repeatable_config.get("column_mapping", None)
 
-        # Fill data rows starting from start_row
-        for row_idx, row_data in enumerate(value):
-            actual_row_idx = start_row + row_idx
-            if actual_row_idx >= len(table.rows):
-                # Need to add new row
-                table.add_row()
-
-            row = table.rows[actual_row_idx]
+        # (cell index, column id) per logical column, the same for every row
+        cell_columns = []
+        for col_idx, col_def in enumerate(columns):
+            # Use column_mapping if provided, otherwise use col_idx
+            if column_mapping and col_idx < len(column_mapping):
+                actual_col_idx = column_mapping[col_idx]
+            else:
+                actual_col_idx = col_idx
+            cell_columns.append((actual_col_idx, col_def.get("id", f"col_{col_idx}")))
 
-            for col_idx, col_def in enumerate(columns):
-                # Use column_mapping if provided, otherwise use col_idx
-                if column_mapping and col_idx < len(column_mapping):
-                    actual_col_idx = column_mapping[col_idx]
-                else:
-                    actual_col_idx = col_idx
+        # Add every missing row up front, then expand the table's cells once
+        missing_rows = start_row + len(value) - len(table.rows)
+        if missing_rows > 0:
+            for _ in range(missing_rows):
+                table.add_row()
+            index.forget_cells(table_index)
+        rows_cells = index.cells(table_index)[start_row:start_row + len(value)]
 
-                if actual_col_idx >= len(row.cells):
+        # Fill data rows starting from start_row
+        for cells, row_data in zip(rows_cells, value):
+            for actual_col_idx, col_id in cell_columns:
+                if actual_col_idx >= len(cells):
                     continue
 
-                cell = row.cells[actual_col_idx]
-                col_id = col_def.get("id", f"col_{col_idx}")
+                cell = cells[actual_col_idx]
                 cell_value = row_data.get(col_id, "") if isinstance(row_data, dict) else ""
 
                 if cell.paragraphs:
@@ -484,22 +920,33 @@ class DocumentService:
         """Convert DOCX to PDF using LibreOffice."""
         output_dir = os.path.dirname(docx_path)
         
-        # LibreOffice command for headless PDF conversion
-        cmd = [
-            settings.libreoffice_path,
-            '--headless',
-            '--convert-to', 'pdf',
-            '--outdir', output_dir,
-            docx_path
-        ]
-        
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=60  # 60 second timeout
-            )
+            with _libreoffice_worker() as worker:
+                if settings.libreoffice_uno:
+                    pdf_path = os.path.splitext(docx_path)[0] + '.pdf'
+                    try:
+                        worker.convert(docx_path, pdf_path)
+                        return pdf_path
+                    except _uno_errors():
+                        logger.warning(
+                            "UNO conversion failed; falling back to soffice", exc_info=True
+                        )
+                
+                # LibreOffice command for headless PDF conversion
+                cmd = [
+                    settings.libreoffice_path,
+                    f'-env:UserInstallation={worker.profile_url}',
+                    '--headless',
+                    '--convert-to', 'pdf',
+                    '--outdir', output_dir,
+                    docx_path
+                ]
+                result = subprocess.run(
+                    cmd,
+                    capture_output=True,
+                    text=True,
+                    timeout=60  # 60 second timeout
+                )
             
             if result.returncode != 0:
                 raise HTTPException(
@@ -529,6 +976,152 @@ class DocumentService:
                 detail="LibreOffice not found. Please install LibreOffice."
             )
     
+    @staticmethod
+    def stop_libreoffice() -> None:
+        """Shut down the LibreOffice listeners this process started."""
+        with _libreoffice_lock:
+            # Workers inherited through fork belong to the parent
+            workers = _libreoffice_workers if _libreoffice_pid == os.getpid() else []
+        for worker in workers:
+            worker.stop()
+    
+    @staticmethod
+    def create_job(
+        db: Session,
+        form_id: int,
+        version_id: Optional[int],
+        user: User
+    ) -> DocumentJob:
+        """Record a pending generation job for a form's current data or one of its versions."""
+        if version_id is not None:
+            version = db.query(FormVersion.id).filter(
+                FormVersion.id == version_id,
+                FormVersion.form_instance_id == form_id
+            ).first()
+            if not version:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Version not found"
+                )
+        
+        job = DocumentJob(
+            form_instance_id=form_id,
+            version_id=version_id,
+            requested_by_id=user.id,
+        )
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+    
+    @staticmethod
+    def schedule_job(background_tasks: BackgroundTasks, job_id: int) -> None:
+        """Run a job after the response is sent."""
+        background_tasks.add_task(DocumentService._run_job, job_id)
+    
+    @staticmethod
+    def _run_job(job_id: int) -> None:
+        """Generate a job's documents with a session of its own and record the outcome."""
+        db = SessionLocal()
+        try:
+            job = db.get(DocumentJob, job_id)
+            if not job or job.status != DocumentJobStatus.PENDING:
+                return
+            job.status = DocumentJobStatus.RUNNING
+            db.commit()
+            
+            try:
+                docx_path, pdf_path = DocumentService.generate_documents(
+                    db, job.form_instance_id, job.version_id
+                )
+            except Exception as exc:
+                db.rollback()
+                job.status = DocumentJobStatus.FAILED
+                job.error = exc.detail if isinstance(exc, HTTPException) else "Document generation failed"
+                job.finished_at = datetime.now(timezone.utc)
+                db.commit()
+                if not isinstance(exc, HTTPException):
+                    raise
+                return
+            
+            job.status = DocumentJobStatus.DONE
+            job.docx_path = docx_path
+            job.pdf_path = pdf_path
+            job.finished_at = datetime.now(timezone.utc)
+            db.commit()
+        finally:
+            db.close()
+    
+    @staticmethod
+    def get_job(db: Session, job_id: int) -> Optional[DocumentJob]:
+        """Get a job, marking it failed if its background task was lost."""
+        job = db.get(DocumentJob, job_id)
+        if not job or job.status not in (DocumentJobStatus.PENDING, DocumentJobStatus.RUNNING):
+            return job
+        
+        # SQLite hands back naive UTC timestamps
+        created_at = job.created_at
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        if datetime.now(timezone.utc) - created_at > JOB_STALE_AFTER:
+            job.status = DocumentJobStatus.FAILED
+            job.error = "Document generation was interrupted"
+            job.finished_at = datetime.now(timezone.utc)
+            db.commit()
+        return job
+    
+    @staticmethod
+    def schedule_version_documents(
+        background_tasks: BackgroundTasks,
+        form_id: int,
+        version_id: int
+    ) -> None:
+        """Queue generation of a version's documents unless it is already queued."""
+        key = (form_id, version_id)
+        with _pending_lock:
+            if key in _pending_generations:
+                return
+            _pending_generations.add(key)
+        
+        background_tasks.add_task(DocumentService._generate_in_background, form_id, version_id)
+    
+    @staticmethod
+    def get_generation_error(form_id: int, version_id: int) -> Optional[str]:
+        """Error from a recent failed background generation of a version, if any."""
+        key = (form_id, version_id)
+        with _pending_lock:
+            failure = _failed_generations.get(key)
+            if not failure:
+                return None
+            error, failed_at = failure
+            if time.monotonic() - failed_at > GENERATION_RETRY_AFTER.total_seconds():
+                del _failed_generations[key]
+                return None
+            return error
+    
+    @staticmethod
+    def _generate_in_background(form_id: int, version_id: int) -> None:
+        """Generate a version's documents with a session of its own."""
+        key = (form_id, version_id)
+        # The request's session is closed before background tasks run
+        db = SessionLocal()
+        try:
+            DocumentService.generate_documents(db, form_id, version_id)
+        except Exception as exc:
+            logger.exception(
+                "Background generation failed for form %s version %s", form_id, version_id
+            )
+            error = exc.detail if isinstance(exc, HTTPException) else "Document generation failed"
+            with _pending_lock:
+                _failed_generations[key] = (error, time.monotonic())
+        else:
+            with _pending_lock:
+                _failed_generations.pop(key, None)
+        finally:
+            db.close()
+            with _pending_lock:
+                _pending_generations.discard(key)
+    
     @staticmethod
     def get_document_paths(
         db: Session,
@@ -536,15 +1129,27 @@ class DocumentService:
         version_id: int
     ) -> Optional[Tuple[str, str]]:
         """Get existing document paths for a version."""
-        version = db.query(FormVersion).filter(
-            FormVersion.id == version_id
-        ).first()
+        # Only the two path columns; the data snapshot is not needed here
+        version = db.query(
+            FormVersion.generated_docx_path,
+            FormVersion.generated_pdf_path
+        ).filter(FormVersion.id == version_id).first()
         
         if not version:
             return None
         
-        if version.generated_docx_path and version.generated_pdf_path:
-            if os.path.exists(version.generated_docx_path) and os.path.exists(version.generated_pdf_path):
-                return (version.generated_docx_path, version.generated_pdf_path)
+        return DocumentService.existing_document_paths(
+            version.generated_docx_path, version.generated_pdf_path
+        )
+    
+    @staticmethod
+    def existing_document_paths(
+        docx_path: Optional[str],
+        pdf_path: Optional[str]
+    ) -> Optional[Tuple[str, str]]:
+        """Return (docx_path, pdf_path) if both were generated and are still on disk."""
+        if docx_path and pdf_path:
+            if os.path.exists(docx_path) and os.path.exists(pdf_path):
+                return (docx_path, pdf_path)
         
         return None
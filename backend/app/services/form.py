@@ -1,16 +1,50 @@
 """Form instance service for CRUD operations and versioning."""
 
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple
+from datetime import datetime, timezone
 
-from sqlalchemy.orm import Session, joinedload
-from fastapi import HTTPException, status
+from sqlalchemy import Row, func, lambda_stmt, select
+from sqlalchemy.orm import Session, joinedload, load_only
+from fastapi import Depends, HTTPException, status
 
+from app.config import get_settings
+from app.database import get_db
 from app.models.form import FormInstance, FormVersion, FormData, FormStatus
 from app.models.template import Template
-from app.models.user import User
-from app.models.audit import ChangeEvent
+from app.models.document import DocumentJob
+from app.models.user import User, UserRole
+from app.models.audit import (
+    ChangeEvent,
+    ChangeEventDetail,
+    FormActivityStats,
+    FormUserStats,
+    FormFieldStats,
+)
 from app.schemas.form import FormInstanceCreate, FormInstanceUpdate, FieldChange
+from app.services.auth import get_current_active_user
+from app.services.cache import CacheService
+
+settings = get_settings()
+
+# A form's owner never changes, so the cached entry only goes stale when
+# the form is deleted
+FORM_META_KEY = "form:{form_id}:owner"
+
+# Everything a form list row shows, read from form_instances alone
+FORM_LIST_COLUMNS = (
+    FormInstance.id,
+    FormInstance.template_id,
+    FormInstance.template_name_cache,
+    FormInstance.title,
+    FormInstance.status,
+    FormInstance.current_version_number,
+    FormInstance.owner_name_cache,
+    FormInstance.created_at,
+    FormInstance.updated_at,
+)
+
+# A version response shows its creator's name only
+VERSION_CREATOR_LOAD = joinedload(FormVersion.created_by).load_only(User.id, User.full_name)
 
 
 class FormService:
@@ -23,14 +57,73 @@ class FormService:
         include_data: bool = True
     ) -> Optional[FormInstance]:
         """Get a form instance by ID."""
-        query = db.query(FormInstance).filter(FormInstance.id == form_id)
+        # Lambda statements are cached by code location, so the SELECT is
+        # neither rebuilt nor recompiled on each request
+        stmt = lambda_stmt(lambda: select(FormInstance).where(FormInstance.id == form_id))
         if include_data:
-            query = query.options(
+            stmt += lambda s: s.options(
                 joinedload(FormInstance.current_data),
                 joinedload(FormInstance.template),
                 joinedload(FormInstance.owner)
             )
-        return query.first()
+        return db.execute(stmt).scalars().first()
+    
+    @staticmethod
+    def get_form_meta(db: Session, form_id: int) -> Optional[Dict[str, Any]]:
+        """Get a form's owner_id, from the cache when available."""
+        key = FORM_META_KEY.format(form_id=form_id)
+        meta = CacheService.get_json(key)
+        if meta is None:
+            # One column only; the full form row is not needed here
+            row = db.execute(
+                select(FormInstance.owner_id).where(FormInstance.id == form_id)
+            ).first()
+            if row is None:
+                return None
+            meta = {"owner_id": row.owner_id}
+            CacheService.set_json(key, meta, settings.form_meta_cache_ttl)
+        return meta
+    
+    @staticmethod
+    def invalidate_form_meta(form_id: int) -> None:
+        """Drop cached metadata after a form is deleted."""
+        CacheService.delete(FORM_META_KEY.format(form_id=form_id))
+    
+    @staticmethod
+    def check_form_access(
+        db: Session,
+        form_id: int,
+        user: User,
+        detail: str = "Not authorized to view this form"
+    ) -> Dict[str, Any]:
+        """
+        Check that a user may read a form: its owner, a reviewer or an admin.
+        
+        Raises 404 if the form does not exist and 403 otherwise; returns the
+        form's metadata (see get_form_meta).
+        """
+        meta = FormService.get_form_meta(db, form_id)
+        if meta is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Form not found"
+            )
+        
+        FormService.authorize_form_read(meta["owner_id"], user, detail)
+        return meta
+    
+    @staticmethod
+    def authorize_form_read(
+        owner_id: int,
+        user: User,
+        detail: str = "Not authorized to view this form"
+    ) -> None:
+        """Raise 403 unless the user owns the form or is a reviewer or admin."""
+        if owner_id != user.id and user.role not in [UserRole.ADMIN, UserRole.REVIEWER]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=detail
+            )
     
     @staticmethod
     def get_user_forms(
@@ -39,15 +132,13 @@ class FormService:
         skip: int = 0,
         limit: int = 100,
         status_filter: Optional[FormStatus] = None
-    ) -> List[FormInstance]:
-        """Get all forms for a user."""
-        query = db.query(FormInstance).filter(FormInstance.owner_id == user_id)
+    ) -> List[Row]:
+        """Get list rows (FORM_LIST_COLUMNS) for a user's forms."""
+        query = db.query(*FORM_LIST_COLUMNS).filter(FormInstance.owner_id == user_id)
         if status_filter:
             query = query.filter(FormInstance.status == status_filter)
-        return query.options(
-            joinedload(FormInstance.template),
-            joinedload(FormInstance.owner)
-        ).order_by(FormInstance.updated_at.desc()).offset(skip).limit(limit).all()
+        # Names come from the denormalized columns, so no relationship is loaded
+        return query.order_by(FormInstance.updated_at.desc()).offset(skip).limit(limit).all()
     
     @staticmethod
     def get_all_forms(
@@ -55,15 +146,12 @@ class FormService:
         skip: int = 0,
         limit: int = 100,
         status_filter: Optional[FormStatus] = None
-    ) -> List[FormInstance]:
-        """Get all forms (for admin/reviewer)."""
-        query = db.query(FormInstance)
+    ) -> List[Row]:
+        """Get list rows (FORM_LIST_COLUMNS) for all forms (for admin/reviewer)."""
+        query = db.query(*FORM_LIST_COLUMNS)
         if status_filter:
             query = query.filter(FormInstance.status == status_filter)
-        return query.options(
-            joinedload(FormInstance.template),
-            joinedload(FormInstance.owner)
-        ).order_by(FormInstance.updated_at.desc()).offset(skip).limit(limit).all()
+        return query.order_by(FormInstance.updated_at.desc()).offset(skip).limit(limit).all()
     
     @staticmethod
     def create_form_instance(
@@ -91,6 +179,8 @@ class FormService:
             title=form_data.title,
             status=FormStatus.DRAFT,
             current_version_number=1,
+            template_name_cache=template.name,
+            owner_name_cache=user.full_name,
         )
         db.add(db_form)
         db.flush()  # Get the ID
@@ -205,37 +295,37 @@ class FormService:
                 detail="Cannot edit a locked or approved form"
             )
         
-        # Get or create form data
-        form_data = db_form.current_data
-        if not form_data:
-            form_data = FormData(
-                form_instance_id=db_form.id,
-                data={},
-            )
-            db.add(form_data)
-        
         # Apply changes and create audit events
-        current_data = dict(form_data.data)
+        form_data = db_form.current_data
+        current_data = dict(form_data.data) if form_data else {}
         
+        events = []
         for change in changes:
+            # Autosave resends untouched fields; only record real edits
+            if change.field_id in current_data and current_data[change.field_id] == change.new_value:
+                continue
+            
             # Record change event
-            db_event = ChangeEvent(
-                form_instance_id=form_id,
-                user_id=user.id,
-                field_id=change.field_id,
-                field_label=change.field_label,
-                old_value=current_data.get(change.field_id),
-                new_value=change.new_value,
-                ip_address=ip_address,
-                user_agent=user_agent,
-            )
-            db.add(db_event)
+            events.append({
+                "form_instance_id": form_id,
+                "user_id": user.id,
+                "field_id": change.field_id,
+                "field_label": change.field_label,
+                "old_value": current_data.get(change.field_id),
+                "new_value": change.new_value,
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+            })
             
             # Update data
             current_data[change.field_id] = change.new_value
         
-        form_data.data = current_data
-        db_form.updated_at = datetime.utcnow()
+        if events:
+            ChangeEvent.bulk_log(db, events)
+            db_form.updated_at = datetime.now(timezone.utc)
+        
+        if events or form_data is None:
+            form_data = FormData.upsert(db, form_id, current_data)
         
         db.commit()
         db.refresh(form_data)
@@ -306,15 +396,62 @@ class FormService:
     
     @staticmethod
     def get_versions(db: Session, form_id: int) -> List[FormVersion]:
-        """Get all versions for a form."""
-        return db.query(FormVersion).filter(
+        """
+        Get all versions for a form, for listing.
+        
+        Only the metadata columns are loaded; data_snapshot holds a full copy
+        of the form data and is fetched per version by get_version.
+        """
+        return db.query(FormVersion).options(
+            load_only(
+                FormVersion.id,
+                FormVersion.form_instance_id,
+                FormVersion.version_number,
+                FormVersion.version_label,
+                FormVersion.status_at_creation,
+                FormVersion.created_at,
+                FormVersion.created_by_id,
+            ),
+            VERSION_CREATOR_LOAD,
+        ).filter(
             FormVersion.form_instance_id == form_id
         ).order_by(FormVersion.version_number.desc()).all()
     
+    @staticmethod
+    def get_versions_fingerprint(db: Session, form_id: int) -> Tuple[Any, ...]:
+        """
+        (count, max id) of a form's versions. Versions are never edited or
+        deleted, and the list leaves out the document paths that are filled
+        in later, so this changes whenever the list does.
+        """
+        return tuple(db.query(
+            func.count(FormVersion.id),
+            func.max(FormVersion.id),
+        ).filter(FormVersion.form_instance_id == form_id).one())
+    
     @staticmethod
     def get_version(db: Session, version_id: int) -> Optional[FormVersion]:
         """Get a specific version."""
-        return db.query(FormVersion).filter(FormVersion.id == version_id).first()
+        return db.query(FormVersion).options(VERSION_CREATOR_LOAD).filter(
+            FormVersion.id == version_id
+        ).first()
+    
+    @staticmethod
+    def get_version_with_form_meta(db: Session, version_id: int) -> Optional[Row]:
+        """
+        Get what a version download needs in one query: the version's form,
+        its stored document paths and the form's owner (for the access check).
+        """
+        return db.execute(
+            select(
+                FormVersion.form_instance_id,
+                FormVersion.generated_docx_path,
+                FormVersion.generated_pdf_path,
+                FormInstance.owner_id,
+            )
+            .join(FormInstance, FormVersion.form_instance_id == FormInstance.id)
+            .where(FormVersion.id == version_id)
+        ).first()
     
     @staticmethod
     def delete_form_instance(db: Session, form_id: int, user: User) -> bool:
@@ -338,10 +475,26 @@ class FormService:
             )
         
         # Delete related records
+        for stats_model in (FormActivityStats, FormUserStats, FormFieldStats):
+            db.query(stats_model).filter(stats_model.form_instance_id == form_id).delete()
+        db.query(ChangeEventDetail).filter(ChangeEventDetail.form_instance_id == form_id).delete()
         db.query(ChangeEvent).filter(ChangeEvent.form_instance_id == form_id).delete()
+        db.query(DocumentJob).filter(DocumentJob.form_instance_id == form_id).delete()
         db.query(FormVersion).filter(FormVersion.form_instance_id == form_id).delete()
         db.query(FormData).filter(FormData.form_instance_id == form_id).delete()
         db.delete(db_form)
         
         db.commit()
+        FormService.invalidate_form_meta(form_id)
         return True
+
+
+def require_form_access(detail: str = "Not authorized to view this form"):
+    """Dependency factory to require read access to the {form_id} form."""
+    def form_access_checker(
+        form_id: int,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_active_user)
+    ) -> Dict[str, Any]:
+        return FormService.check_form_access(db, form_id, current_user, detail)
+    return form_access_checker
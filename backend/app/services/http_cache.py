@@ -0,0 +1,40 @@
+"""Conditional GET support: ETags and 304 Not Modified responses."""
+
+import hashlib
+from typing import Any, Dict
+
+from fastapi import Request, Response, status
+
+# Clients may keep a copy but must revalidate it before every reuse
+REVALIDATE = "private, no-cache"
+
+
+class ETagService:
+    """Build ETags and answer requests whose If-None-Match still matches."""
+
+    @staticmethod
+    def make_etag(*parts: Any) -> str:
+        """Strong ETag over the values that determine a response."""
+        return '"%s"' % hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+
+    @staticmethod
+    def matches(request: Request, etag: str) -> bool:
+        """Whether the request's If-None-Match names this ETag (or '*')."""
+        if_none_match = request.headers.get("if-none-match")
+        if not if_none_match:
+            return False
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return etag in tags or "*" in tags
+
+    @staticmethod
+    def headers(etag: str, cache_control: str = REVALIDATE) -> Dict[str, str]:
+        """Validator headers to send with a full response."""
+        return {"ETag": etag, "Cache-Control": cache_control}
+
+    @staticmethod
+    def not_modified(etag: str, cache_control: str = REVALIDATE) -> Response:
+        """Empty 304 telling the client to reuse its copy."""
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers=ETagService.headers(etag, cache_control),
+        )
@@ -0,0 +1,58 @@
+"""A process pool for CPU-bound work that survives a crashed worker."""
+
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class ProcessPool:
+    """
+    A spawn-context ProcessPoolExecutor that is replaced when it breaks.
+
+    A worker that dies (killed for memory, a crash in a C extension) leaves
+    its executor permanently broken, failing every later submission. The
+    broken executor is swapped for a fresh one under a lock and the call is
+    retried once; a call that breaks the new pool too is not retried again.
+    Spawned rather than forked, so workers don't inherit pooled connections
+    or threads.
+    """
+
+    def __init__(self, max_workers: int):
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executor = self._new_executor()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self._max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def _replace(self, broken: ProcessPoolExecutor) -> None:
+        """Swap in a new executor, unless another caller already replaced it."""
+        with self._lock:
+            if self._executor is broken:
+                self._executor = self._new_executor()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(*args) in a worker process, rebuilding the pool if it broke."""
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            executor = self._executor
+            try:
+                return await loop.run_in_executor(executor, fn, *args)
+            except BrokenProcessPool:
+                self._replace(executor)
+                if attempt:
+                    raise
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, cancelling queued work."""
+        with self._lock:
+            self._executor.shutdown(cancel_futures=True)
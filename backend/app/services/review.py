@@ -1,15 +1,16 @@
 """Review workflow service for comments and state transitions."""
 
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, selectinload
 from fastapi import HTTPException, status
 
 from app.models.form import FormInstance, FormVersion, FormStatus
 from app.models.review import CommentThread, Comment, ReviewAction, ReviewActionType
 from app.models.user import User, UserRole
 from app.models.audit import ChangeEvent
+from app.services.form import FormService
 
 
 class ReviewService:
@@ -74,7 +75,7 @@ class ReviewService:
         # Update form status
         db_form.status = FormStatus.IN_REVIEW
         db_form.current_version_number = new_version_number
-        db_form.submitted_at = datetime.utcnow()
+        db_form.submitted_at = datetime.now(timezone.utc)
         
         # Create review action
         db_action = ReviewAction(
@@ -335,20 +336,58 @@ class ReviewService:
     def get_form_comments(
         db: Session,
         form_id: int,
-        include_resolved: bool = False
+        include_resolved: bool = False,
+        skip: int = 0,
+        limit: int = 100,
+        reader: Optional[User] = None
     ) -> List[CommentThread]:
-        """Get all comment threads for a form."""
+        """
+        Get a page of comment threads for a form, newest first.
+        
+        Each thread's comments collection holds only its non-deleted comments.
+        With a reader, threads are returned only if the reader may read the form.
+        """
         query = db.query(CommentThread).filter(
             CommentThread.form_instance_id == form_id
         )
+        if reader:
+            query = ReviewService._readable_by(query, CommentThread.form_instance_id, reader)
         
         if not include_resolved:
             query = query.filter(CommentThread.is_resolved == False)
         
+        # One extra SELECT for all comments rather than repeating every thread
+        # row per comment; deleted comments are filtered out in SQL
         return query.options(
-            joinedload(CommentThread.comments).joinedload(Comment.author),
-            joinedload(CommentThread.resolved_by)
-        ).order_by(CommentThread.created_at.desc()).all()
+            selectinload(
+                CommentThread.comments.and_(Comment.is_deleted == False)
+            ).joinedload(Comment.author).load_only(User.id, User.full_name),
+            joinedload(CommentThread.resolved_by).load_only(User.id, User.full_name)
+        ).order_by(
+            CommentThread.created_at.desc(), CommentThread.id.desc()
+        ).offset(skip).limit(limit).all()
+    
+    @staticmethod
+    def get_form_comments_for_user(
+        db: Session,
+        form_id: int,
+        user: User,
+        include_resolved: bool = False,
+        skip: int = 0,
+        limit: int = 100
+    ) -> List[CommentThread]:
+        """
+        Get a page of comment threads, checking read access in the same query.
+        
+        Only an empty page needs a separate check, to tell a form without
+        threads from a missing (404) or forbidden (403) one.
+        """
+        threads = ReviewService.get_form_comments(
+            db, form_id, include_resolved, skip, limit, reader=user
+        )
+        if not threads:
+            FormService.check_form_access(db, form_id, user, "Not authorized to view comments")
+        return threads
     
     @staticmethod
     def resolve_thread(
@@ -368,7 +407,7 @@ class ReviewService:
             )
         
         thread.is_resolved = True
-        thread.resolved_at = datetime.utcnow()
+        thread.resolved_at = datetime.now(timezone.utc)
         thread.resolved_by_id = user.id
         
         db.commit()
@@ -379,12 +418,43 @@ class ReviewService:
     @staticmethod
     def get_review_history(
         db: Session,
-        form_id: int
+        form_id: int,
+        reader: Optional[User] = None
     ) -> List[ReviewAction]:
-        """Get review action history for a form."""
-        return db.query(ReviewAction).filter(
+        """
+        Get review action history for a form.
+        
+        With a reader, actions are returned only if the reader may read the form.
+        """
+        query = db.query(ReviewAction).filter(
             ReviewAction.form_instance_id == form_id
-        ).options(
-            joinedload(ReviewAction.performed_by),
-            joinedload(ReviewAction.version)
+        )
+        if reader:
+            query = ReviewService._readable_by(query, ReviewAction.form_instance_id, reader)
+        
+        return query.options(
+            # Only the actor's name is shown; the version is referenced by id
+            joinedload(ReviewAction.performed_by).load_only(User.id, User.full_name)
         ).order_by(ReviewAction.created_at.desc()).all()
+    
+    @staticmethod
+    def get_review_history_for_user(
+        db: Session,
+        form_id: int,
+        user: User
+    ) -> List[ReviewAction]:
+        """Get review action history, checking read access in the same query."""
+        actions = ReviewService.get_review_history(db, form_id, reader=user)
+        if not actions:
+            FormService.check_form_access(db, form_id, user, "Not authorized to view review history")
+        return actions
+    
+    @staticmethod
+    def _readable_by(query, form_id_column, user: User):
+        """Restrict a query on a form's rows to forms the user may read."""
+        # Reviewers and admins may read every form (see FormService.authorize_form_read)
+        if user.role in [UserRole.ADMIN, UserRole.REVIEWER]:
+            return query
+        return query.join(FormInstance, form_id_column == FormInstance.id).filter(
+            FormInstance.owner_id == user.id
+        )
@@ -0,0 +1,61 @@
+"""Storage service for generated documents (local disk or S3)."""
+
+import os
+from functools import lru_cache
+from typing import Optional
+
+from app.config import get_settings
+
+settings = get_settings()
+
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+PDF_MEDIA_TYPE = "application/pdf"
+
+# Generated documents above this size are uploaded in parts
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+
+
+@lru_cache()
+def _s3_client():
+    """Shared S3 client; boto3 is only required when STORAGE_BACKEND=s3."""
+    import boto3
+    return boto3.client("s3")
+
+
+class StorageService:
+    """Service for publishing and locating generated documents."""
+
+    @staticmethod
+    def is_remote() -> bool:
+        """Whether generated documents are served from object storage."""
+        return settings.storage_backend == "s3"
+
+    @staticmethod
+    def object_key(path: str) -> str:
+        """Object key for a generated file: its path relative to generated_dir."""
+        return os.path.relpath(path, settings.generated_dir).replace(os.sep, "/")
+
+    @staticmethod
+    def upload(path: str, media_type: str) -> None:
+        """Upload a generated file to the bucket under its object key."""
+        from boto3.s3.transfer import TransferConfig
+
+        _s3_client().upload_file(
+            path,
+            settings.s3_bucket,
+            StorageService.object_key(path),
+            ExtraArgs={"ContentType": media_type},
+            Config=TransferConfig(multipart_threshold=MULTIPART_THRESHOLD),
+        )
+
+    @staticmethod
+    def presigned_url(key: str, filename: Optional[str] = None) -> str:
+        """Short-lived GET URL for an object, optionally forcing a download name."""
+        params = {"Bucket": settings.s3_bucket, "Key": key}
+        if filename:
+            params["ResponseContentDisposition"] = f'attachment; filename="{filename}"'
+        return _s3_client().generate_presigned_url(
+            "get_object",
+            Params=params,
+            ExpiresIn=settings.s3_presign_expires,
+        )
@@ -2,30 +2,49 @@
 
 import os
 import re
-import shutil
-from typing import Optional, List, Dict, Any
+import time
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 
+import aiofiles
+import aiofiles.os
 from fastapi import UploadFile, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session, undefer
 from docx import Document
 from docx.table import Table
 from docx.text.paragraph import Paragraph
 
 from app.config import get_settings
 from app.models.template import Template
-from app.schemas.template import TemplateCreate, TemplateUpdate, TemplateSchema
+from app.schemas.template import (
+    TemplateCreate,
+    TemplateUpdate,
+    TemplateSchema,
+    TemplateListResponse,
+    TemplateResponse,
+)
+from app.services.process_pool import ProcessPool
 
 settings = get_settings()
 
+# (expires_at, rows) for the published template list, fetched on every
+# "new form" page load but changed only by admins
+_published_templates_cache: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
 
 class TemplateService:
     """Service for template management and DOCX processing."""
     
     @staticmethod
     def get_template(db: Session, template_id: int) -> Optional[Template]:
-        """Get a template by ID."""
-        return db.query(Template).filter(Template.id == template_id).first()
+        """Get a template by ID, with its schema."""
+        return db.query(Template).options(undefer(Template.schema)).filter(
+            Template.id == template_id
+        ).first()
     
     @staticmethod
     def get_templates(
@@ -41,20 +60,75 @@ class TemplateService:
         return query.offset(skip).limit(limit).all()
     
     @staticmethod
-    def get_published_templates(db: Session) -> List[Template]:
-        """Get all published templates."""
-        return db.query(Template).filter(
+    def get_templates_fingerprint(db: Session, active_only: bool = True) -> Tuple[Any, ...]:
+        """
+        (count, max id, latest change) over the templates get_templates lists.
+        
+        Any insert, update or deactivation changes it, so it can stand in for
+        the list when building an ETag.
+        """
+        query = db.query(
+            func.count(Template.id),
+            func.max(Template.id),
+            func.max(func.coalesce(Template.updated_at, Template.created_at)),
+        )
+        if active_only:
+            query = query.filter(Template.is_active == True)
+        return tuple(query.one())
+    
+    @staticmethod
+    def get_published_templates(db: Session) -> List[Dict[str, Any]]:
+        """
+        Get all published templates as serialized TemplateListResponse dicts.
+        
+        Cached in-process for published_templates_cache_ttl seconds. Changes
+        made through this process clear the cache at once; other workers
+        pick them up when their copy expires.
+        """
+        global _published_templates_cache
+        cached = _published_templates_cache
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        
+        # List columns only; the schema JSON is not shown in the list
+        templates = db.query(
+            Template.id,
+            Template.name,
+            Template.description,
+            Template.version,
+            Template.is_active,
+            Template.is_published,
+            Template.created_at,
+        ).filter(
             Template.is_active == True,
             Template.is_published == True
         ).all()
+        rows = [TemplateListResponse.model_validate(t).model_dump() for t in templates]
+        
+        _published_templates_cache = (
+            time.monotonic() + settings.published_templates_cache_ttl, rows
+        )
+        return rows
+    
+    @staticmethod
+    def invalidate_published_templates() -> None:
+        """Drop the cached published template list after a template changes."""
+        global _published_templates_cache
+        _published_templates_cache = None
     
     @staticmethod
     async def create_template(
         db: Session,
         template_data: TemplateCreate,
-        file: UploadFile
+        file: UploadFile,
+        executor: Optional[ProcessPool] = None
     ) -> Template:
-        """Create a new template from an uploaded DOCX file."""
+        """
+        Create a new template from an uploaded DOCX file.
+        
+        The DOCX is parsed on executor (the app's process pool) when given,
+        otherwise in the threadpool.
+        """
         # Validate file type
         if not file.filename.endswith(('.docx', '.doc')):
             raise HTTPException(
@@ -68,14 +142,14 @@ class TemplateService:
         stored_filename = f"{timestamp}_{safe_filename}"
         file_path = os.path.join(settings.template_dir, stored_filename)
         
-        # Save file
-        os.makedirs(settings.template_dir, exist_ok=True)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await TemplateService._save_upload(file, file_path)
         
-        # Extract schema from DOCX
+        # Extract schema from DOCX, off the event loop
         try:
-            schema = TemplateService.extract_schema_from_docx(file_path)
+            if executor is not None:
+                schema = await executor.run(TemplateService.extract_schema_from_docx, file_path)
+            else:
+                schema = await run_in_threadpool(TemplateService.extract_schema_from_docx, file_path)
         except Exception as e:
             # Clean up file on error
             os.remove(file_path)
@@ -94,11 +168,39 @@ class TemplateService:
             schema=schema,
         )
         db.add(db_template)
-        db.commit()
-        db.refresh(db_template)
+        # Committing blocks on the database, so it runs in the threadpool
+        await run_in_threadpool(db.commit)
+        # Name the response's columns: a plain refresh leaves the deferred
+        # schema unloaded, and it would then lazy-load on the event loop
+        await run_in_threadpool(db.refresh, db_template, list(TemplateResponse.model_fields))
         
         return db_template
     
+    @staticmethod
+    async def _save_upload(file: UploadFile, file_path: str) -> None:
+        """
+        Stream an uploaded file to disk in chunks, without blocking the event
+        loop or holding the whole file in memory.
+        
+        Uploads over max_template_upload_mb are rejected with a 413.
+        """
+        max_bytes = settings.max_template_upload_mb * 1024 * 1024
+        written = 0
+        await aiofiles.os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        async with aiofiles.open(file_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                written += len(chunk)
+                if written > max_bytes:
+                    break
+                await buffer.write(chunk)
+        
+        if written > max_bytes:
+            await aiofiles.os.remove(file_path)
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Template file exceeds {settings.max_template_upload_mb} MB"
+            )
+    
     @staticmethod
     def update_template(
         db: Session,
@@ -120,20 +222,38 @@ class TemplateService:
             setattr(db_template, key, value)
         
         db.commit()
+        TemplateService.invalidate_published_templates()
         db.refresh(db_template)
         return db_template
     
     @staticmethod
-    def delete_template(db: Session, template_id: int) -> bool:
-        """Soft delete a template (mark as inactive)."""
-        db_template = TemplateService.get_template(db, template_id)
-        if not db_template:
-            return False
+    def _update_flags(db: Session, template_id: int, **values: bool) -> bool:
+        """
+        Set boolean flags on a template with a single UPDATE.
         
-        db_template.is_active = False
+        The row (and its schema JSON) is never loaded; returns False if no
+        template has this ID.
+        """
+        result = db.execute(
+            update(Template).where(Template.id == template_id).values(**values)
+        )
         db.commit()
+        if result.rowcount == 0:
+            return False
+        
+        TemplateService.invalidate_published_templates()
         return True
     
+    @staticmethod
+    def delete_template(db: Session, template_id: int) -> bool:
+        """Soft delete a template (mark as inactive)."""
+        return TemplateService._update_flags(db, template_id, is_active=False)
+    
+    @staticmethod
+    def set_published(db: Session, template_id: int, is_published: bool) -> bool:
+        """Publish or unpublish a template; False if it does not exist."""
+        return TemplateService._update_flags(db, template_id, is_published=is_published)
+    
     @staticmethod
     def extract_schema_from_docx(file_path: str) -> Dict[str, Any]:
         """
@@ -3,6 +3,7 @@
 import sys
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -17,6 +18,14 @@ from app.services.auth import AuthService
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 SCHEMA_FILE = os.path.join(SCRIPT_DIR, 'irb_anonymous_survey_schema.json')
 
+# (email, password, full name, role, label)
+SEED_USERS = [
+    ("admin@example.com", "admin123", "Admin User", UserRole.ADMIN, "admin"),
+    ("reviewer@example.com", "reviewer123", "Jane Reviewer", UserRole.REVIEWER, "reviewer"),
+    ("researcher@example.com", "researcher123", "John Researcher", UserRole.RESEARCHER, "researcher"),
+]
+
+
 def load_schema():
     """Load template schema from JSON file."""
     if os.path.exists(SCHEMA_FILE):
@@ -35,41 +44,25 @@ def seed_database():
         # Create users
         print("Creating users...")
 
-        # Admin user
-        admin = db.query(User).filter(User.email == "admin@example.com").first()
-        if not admin:
-            admin = User(
-                email="admin@example.com",
-                hashed_password=AuthService.get_password_hash("admin123"),
-                full_name="Admin User",
-                role=UserRole.ADMIN,
-            )
-            db.add(admin)
-            print("  Created admin user: admin@example.com / admin123")
-
-        # Reviewer user
-        reviewer = db.query(User).filter(User.email == "reviewer@example.com").first()
-        if not reviewer:
-            reviewer = User(
-                email="reviewer@example.com",
-                hashed_password=AuthService.get_password_hash("reviewer123"),
-                full_name="Jane Reviewer",
-                role=UserRole.REVIEWER,
-            )
-            db.add(reviewer)
-            print("  Created reviewer user: reviewer@example.com / reviewer123")
-
-        # Researcher user
-        researcher = db.query(User).filter(User.email == "researcher@example.com").first()
-        if not researcher:
-            researcher = User(
-                email="researcher@example.com",
-                hashed_password=AuthService.get_password_hash("researcher123"),
-                full_name="John Researcher",
-                role=UserRole.RESEARCHER,
+        existing = {
+            email for (email,) in db.query(User.email).filter(
+                User.email.in_([user[0] for user in SEED_USERS])
             )
-            db.add(researcher)
-            print("  Created researcher user: researcher@example.com / researcher123")
+        }
+        missing = [user for user in SEED_USERS if user[0] not in existing]
+
+        # bcrypt releases the GIL, so hash the missing users' passwords in parallel
+        with ThreadPoolExecutor(max_workers=len(SEED_USERS)) as pool:
+            hashes = list(pool.map(AuthService.get_password_hash, [user[1] for user in missing]))
+
+        for (email, password, full_name, role, label), hashed_password in zip(missing, hashes):
+            db.add(User(
+                email=email,
+                hashed_password=hashed_password,
+                full_name=full_name,
+                role=role,
+            ))
+            print(f"  Created {label} user: {email} / {password}")
 
         db.commit()
 
@@ -1,5 +1,6 @@
 import axios from 'axios'
 import { useAuthStore } from '../stores/authStore'
+import type { DocumentJob } from '../types'
 
 const API_URL = import.meta.env.VITE_API_URL || '/api'
 
@@ -216,13 +217,38 @@ export const reviewApi = {
 }
 
 // Export API
+const JOB_POLL_INTERVAL_MS = 1000
+
 export const exportApi = {
-  generate: async (formId: number, versionId?: number) => {
+  // Queues generation; poll the returned job until it is done
+  generate: async (formId: number, versionId?: number): Promise<DocumentJob> => {
     const response = await api.post(`/export/form/${formId}/generate`, null, {
       params: { version_id: versionId },
     })
     return response.data
   },
+  getJob: async (jobId: number): Promise<DocumentJob> => {
+    const response = await api.get(`/export/jobs/${jobId}`)
+    return response.data
+  },
+  downloadJobFile: async (jobId: number, format: 'docx' | 'pdf') => {
+    const response = await api.get(`/export/jobs/${jobId}/${format}`, {
+      responseType: 'blob',
+    })
+    return response.data
+  },
+  // Generate off the request path, wait for the job, then download its file
+  exportDocument: async (formId: number, format: 'docx' | 'pdf', versionId?: number) => {
+    let job = await exportApi.generate(formId, versionId)
+    while (job.status === 'pending' || job.status === 'running') {
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS))
+      job = await exportApi.getJob(job.id)
+    }
+    if (job.status === 'failed') {
+      throw new Error(job.error || 'Document generation failed')
+    }
+    return exportApi.downloadJobFile(job.id, format)
+  },
   downloadDocx: async (formId: number, versionId?: number) => {
     const response = await api.get(`/export/form/${formId}/docx`, {
       params: { version_id: versionId },
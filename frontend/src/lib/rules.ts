@@ -0,0 +1,92 @@
+// Conditional rule evaluation for the form editor.
+//
+// Rules are data (field, operator, value); interpreting them means a switch
+// on the operator and a split of the field path for every condition on
+// every render. compileRules does that work once per template schema and
+// returns closures, so each keystroke only runs the checks themselves.
+
+type Predicate = (values: any) => boolean
+type CompiledRule = {
+  conditions: Predicate[]
+  thenActions: [string, boolean][]
+  elseActions: [string, boolean][]
+}
+
+export type RuleEvaluator = (values: any) => Set<string>
+
+// Read a dot-notation path (e.g. "personnel.has_alt_contact") from split keys
+const getter = (path: string) => {
+  const keys = path.split('.')
+  return (obj: any): any => keys.reduce((curr, key) => curr?.[key], obj)
+}
+
+const compileCondition = (condition: any): Predicate => {
+  const get = getter(condition.field)
+  const expected = condition.value
+
+  switch (condition.operator) {
+    case 'equals':
+      return (values) => get(values) === expected
+    case 'not_equals':
+      return (values) => get(values) !== expected
+    case 'contains': {
+      const lowered = typeof expected === 'string' ? expected.toLowerCase() : expected
+      return (values) => {
+        const fieldValue = get(values)
+        if (Array.isArray(fieldValue)) return fieldValue.includes(expected)
+        if (typeof fieldValue === 'string') return fieldValue.toLowerCase().includes(lowered)
+        return false
+      }
+    }
+    case 'is_empty':
+      return (values) => {
+        const fieldValue = get(values)
+        return !fieldValue || fieldValue === '' || (Array.isArray(fieldValue) && fieldValue.length === 0)
+      }
+    case 'is_not_empty':
+    case 'not_empty':
+      return (values) => {
+        const fieldValue = get(values)
+        return !!fieldValue && fieldValue !== '' && (!Array.isArray(fieldValue) || fieldValue.length > 0)
+      }
+    default:
+      // Unsupported operators don't constrain the rule
+      return () => true
+  }
+}
+
+// Only show/hide affect visibility; [field, hide] pairs in rule order
+const compileActions = (actions: any[] | undefined): [string, boolean][] =>
+  (actions || [])
+    .filter((action) => action.action === 'hide' || action.action === 'show')
+    .map((action): [string, boolean] => [action.field, action.action === 'hide'])
+
+export const compileRules = (schema: any): RuleEvaluator => {
+  if (!schema) return () => new Set<string>()
+
+  // Fields with visible: false start hidden; rules can show them
+  const hiddenByDefault: string[] = (schema.fields || [])
+    .filter((field: any) => field.visible === false)
+    .map((field: any) => field.id)
+
+  const rules: CompiledRule[] = (schema.rules || []).map((rule: any) => ({
+    conditions: (rule.conditions || []).map(compileCondition),
+    thenActions: compileActions(rule.then_actions),
+    elseActions: compileActions(rule.else_actions),
+  }))
+
+  return (values) => {
+    const hidden = new Set<string>(hiddenByDefault)
+    for (const rule of rules) {
+      const conditionsMet = rule.conditions.every((check) => check(values))
+      for (const [field, hide] of conditionsMet ? rule.thenActions : rule.elseActions) {
+        if (hide) {
+          hidden.add(field)
+        } else {
+          hidden.delete(field)
+        }
+      }
+    }
+    return hidden
+  }
+}
@@ -1,4 +1,4 @@
-import { useEffect, useState, useCallback } from 'react'
+import { useEffect, useState, useCallback, useMemo } from 'react'
 import { useParams, useNavigate } from 'react-router-dom'
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query'
 import { useForm, Controller, useWatch } from 'react-hook-form'
@@ -17,6 +17,7 @@ import {
   Trash2,
 } from 'lucide-react'
 import { formsApi, templatesApi, reviewApi, versionsApi, exportApi } from '../lib/api'
+import { compileRules } from '../lib/rules'
 import type { TemplateSchemaSection, TemplateSchemaField } from '../types'
 
 // Simple debounce utility
@@ -75,83 +76,12 @@ export default function FormEditorPage() {
   // Watch all form values - useWatch triggers re-render on changes
   const watchedValues = useWatch({ control })
 
-  // Helper to get nested value by dot-notation path (e.g., "personnel.has_alt_contact")
-  const getNestedValue = (obj: any, path: string): any => {
-    return path.split('.').reduce((curr, key) => curr?.[key], obj)
-  }
-
-  // Evaluate conditional rules - computed on every render
-  const computeHiddenFields = (): Set<string> => {
-    if (!template?.schema) return new Set<string>()
-
-    const newHidden = new Set<string>()
-
-    // First, hide fields that have visible: false by default
-    const schemaFields = template.schema.fields || []
-    schemaFields.forEach((field: any) => {
-      if (field.visible === false) {
-        newHidden.add(field.id)
-      }
-    })
-
-    // Then evaluate rules (which can show hidden fields)
-    if (!template.schema.rules) {
-      return newHidden
-    }
-
-    template.schema.rules.forEach((rule: any) => {
-      let conditionsMet = true
-
-      for (const condition of rule.conditions || []) {
-        // Use getNestedValue to properly access dot-notation paths like "personnel.has_alt_contact"
-        const fieldValue = getNestedValue(watchedValues, condition.field)
-
-        // Debug specific rules
-        if (rule.id === 'rule_alt_contact' || rule.id === 'rule_funding_intramural') {
-          console.log(`Rule ${rule.id}: field=${condition.field}, value=${fieldValue}, expected=${condition.value}`)
-        }
-
-        switch (condition.operator) {
-          case 'equals':
-            conditionsMet = conditionsMet && fieldValue === condition.value
-            break
-          case 'not_equals':
-            conditionsMet = conditionsMet && fieldValue !== condition.value
-            break
-          case 'contains':
-            if (Array.isArray(fieldValue)) {
-              conditionsMet = conditionsMet && fieldValue.includes(condition.value)
-            } else if (typeof fieldValue === 'string') {
-              conditionsMet = conditionsMet && fieldValue.toLowerCase().includes(condition.value.toLowerCase())
-            } else {
-              conditionsMet = false
-            }
-            break
-          case 'is_empty':
-            conditionsMet = conditionsMet && (!fieldValue || fieldValue === '' || (Array.isArray(fieldValue) && fieldValue.length === 0))
-            break
-          case 'is_not_empty':
-          case 'not_empty':
-            conditionsMet = conditionsMet && fieldValue && fieldValue !== '' && (!Array.isArray(fieldValue) || fieldValue.length > 0)
-            break
-        }
-      }
-
-      const actions = conditionsMet ? rule.then_actions : rule.else_actions
-
-      actions?.forEach((action: any) => {
-        if (action.action === 'hide') {
-          newHidden.add(action.field)
-        } else if (action.action === 'show') {
-          newHidden.delete(action.field)
-        }
-      })
-    })
-
-    return newHidden
-  }
-
-  const hiddenFieldsComputed = computeHiddenFields()
+  // Compile conditional rules once per template; re-evaluate only when values change
+  const evaluateRules = useMemo(() => compileRules(template?.schema), [template?.schema])
+  const hiddenFieldsComputed = useMemo(
+    () => evaluateRules(watchedValues),
+    [evaluateRules, watchedValues]
+  )
 
   // Autosave mutation
   const saveMutation = useMutation({
@@ -214,9 +144,7 @@ export default function FormEditorPage() {
   const handleExport = async (format: 'docx' | 'pdf') => {
     try {
       toast.loading('Generating document...')
-      const blob = format === 'docx' 
-        ? await exportApi.downloadDocx(Number(id))
-        : await exportApi.downloadPdf(Number(id))
+      const blob = await exportApi.exportDocument(Number(id), format)
       
       const url = window.URL.createObjectURL(blob)
       const a = document.createElement('a')
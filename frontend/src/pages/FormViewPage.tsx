@@ -19,7 +19,7 @@ import {
 } from 'lucide-react'
 import { formsApi, templatesApi, versionsApi, reviewApi, auditApi, exportApi } from '../lib/api'
 import { useAuthStore } from '../stores/authStore'
-import type { FormVersion, ChangeEvent, CommentThread, FormStatus } from '../types'
+import type { FormVersionListItem, ChangeEvent, CommentThread, FormStatus } from '../types'
 import clsx from 'clsx'
 import { format } from 'date-fns'
 
@@ -114,9 +114,7 @@ export default function FormViewPage() {
   const handleExport = async (format: 'docx' | 'pdf') => {
     try {
       toast.loading('Generating document...')
-      const blob = format === 'docx' 
-        ? await exportApi.downloadDocx(Number(id))
-        : await exportApi.downloadPdf(Number(id))
+      const blob = await exportApi.exportDocument(Number(id), format)
       
       const url = window.URL.createObjectURL(blob)
       const a = document.createElement('a')
@@ -296,7 +294,7 @@ export default function FormViewPage() {
 
       {activeTab === 'versions' && (
         <div className="card divide-y divide-surface-100">
-          {versions?.map((version: FormVersion) => (
+          {versions?.map((version: FormVersionListItem) => (
             <div key={version.id} className="p-4 flex items-center gap-4">
               <div className="w-10 h-10 rounded-lg bg-surface-100 flex items-center justify-center">
                 <span className="text-sm font-semibold text-surface-600">v{version.version_number}</span>
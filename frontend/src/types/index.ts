@@ -101,6 +101,9 @@ export interface FormVersion {
   created_by_name?: string
 }
 
+// Version list entries leave out the snapshot and document paths
+export type FormVersionListItem = Omit<FormVersion, 'data_snapshot' | 'generated_docx_path' | 'generated_pdf_path'>
+
 // Audit types
 export interface ChangeEvent {
   id: number
@@ -152,3 +155,14 @@ export interface ReviewAction {
   notes?: string
   created_at: string
 }
+
+// Export types
+export interface DocumentJob {
+  id: number
+  form_instance_id: number
+  version_id?: number
+  status: 'pending' | 'running' | 'done' | 'failed'
+  error?: string
+  created_at: string
+  finished_at?: string
+}